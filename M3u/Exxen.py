@@ -2,12 +2,20 @@ import asyncio
 import aiohttp
 import re
 import os
+import sys
 from itertools import islice
 from urllib.parse import urljoin, unquote
 from bs4 import BeautifulSoup
 import logging
 import time
 
+# Ortak tekrar deneme / devre kesici kuralları ve kayıt/oynatma katmanı depo kökünde
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_cassette
+import http_retry
+from m3u_lib import iter_entries
+from m3u8_scan import CHUNK_SIZE, StreamSearch, decoder, search_chunks
+
 # --- LOGLAMA AYARLARI ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -25,6 +33,8 @@ HEADERS = {
     "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
 }
+# Önceki çalıştırmada linki bulunan bölüm için yeni çözümün beklendiği en uzun süre (sn)
+STALE_DEADLINE = 20
 
 # --- YARDIMCI FONKSİYONLAR ---
 
@@ -54,24 +64,78 @@ def hex_to_string(hex_str):
         logger.error(f"[!] Hex çözme hatası: {hex_str} -> {e}")
         return None
 
-async def fetch_page(session, url, timeout=45):
-    """Bir web sayfasının içeriğini asenkron olarak alır."""
-    try:
-        async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
-            if response.status == 200:
-                return await response.text()
-            else:
-                logger.warning(f"[!] HTTP {response.status} hatası: {url}")
-                return None
-    except asyncio.TimeoutError:
-        logger.error(f"[!] Zaman aşımı hatası ({timeout}s): {url}")
-        return None
-    except Exception as e:
-        logger.error(f"[!] Sayfa getirme hatası ({url}): {e}")
-        return None
+async def fetch_page(session, url, timeout=45, patterns=None):
+    """
+    Bir web sayfasının içeriğini asenkron olarak alır. Geçici hatalar
+    (zaman aşımı, 429/5xx) artan aralıklarla tekrar denenir; art arda hata
+    veren host'a bir süre hiç istek atılmaz (bkz. http_retry).
+    patterns (öncelik sıralı derlenmiş desenler) verilirse gövde parça parça
+    taranır, eşleşme bulununca indirme kesilir ve metin yerine
+    m3u8_scan.search_chunks sonucu döner.
+    """
+    breaker = http_retry.breaker_for(url)
+    for attempt in range(http_retry.RETRIES + 1):
+        if not breaker.allow():
+            logger.warning(f"[!] Host geçici olarak devre dışı, atlanıyor: {url}")
+            return None
+        status = retry_after = body = None
+        try:
+            started = time.perf_counter()
+            async with session.get(http_cassette.replay_url(url), headers=HEADERS,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                status = response.status
+                breaker.record(status)
+                if http_cassette.recording():
+                    body = await response.read()
+                    http_cassette.record("GET", url, status, response.headers, body, time.perf_counter() - started)
+                if response.status not in http_retry.RETRY_STATUS:
+                    if response.status == 200:
+                        if patterns is not None:
+                            return await scan_body(response, patterns, body)
+                        return await response.text()
+                    logger.warning(f"[!] HTTP {response.status} hatası: {url}")
+                    return None
+                logger.warning(f"[!] HTTP {response.status} hatası (deneme {attempt + 1}): {url}")
+                retry_after = http_retry.retry_after(response.headers)
+        except asyncio.TimeoutError:
+            logger.error(f"[!] Zaman aşımı hatası ({timeout}s, deneme {attempt + 1}): {url}")
+        except aiohttp.ClientConnectionError as e:
+            logger.error(f"[!] Bağlantı hatası (deneme {attempt + 1}) ({url}): {e}")
+        except Exception as e:
+            breaker.abandon()
+            logger.error(f"[!] Sayfa getirme hatası ({url}): {e}")
+            return None
+        if status is None:
+            breaker.record(None)
+        delay = http_retry.backoff_delay(attempt, retry_after)
+        if delay is None or attempt == http_retry.RETRIES:
+            return None
+        await asyncio.sleep(delay)
+    return None
+
+async def scan_body(response, patterns, body=None):
+    """Yanıt gövdesini parça parça tarar; eşleşme bulununca okumayı bırakır."""
+    decode = decoder(response.charset)
+    if body is not None:
+        # Kayıt modunda gövde zaten okundu
+        return search_chunks([decode.decode(body, final=True)], patterns)
+    search = StreamSearch(patterns)
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        if search.feed(decode.decode(chunk)):
+            # Okunmayan gövde bağlantıyla birlikte bırakılır
+            response.close()
+            return search.finish()
+    search.feed(decode.decode(b"", final=True))
+    return search.finish()
 
 # --- M3U8 ÇIKARMA MANTIĞI (KOTLIN KODUNDAN UYARLANDI) ---
 
+# Gujan iframe'i: önce oynatıcının file: değeri, yoksa <source> etiketi
+GUJAN_PATTERNS = (
+    re.compile(r'file\s*:\s*["\'](https?://[^"\']+\.m3u8)["\']'),
+    re.compile(r'<source\s+src=["\'](https?://[^"\']+\.m3u8)["\']'),
+)
+
 async def find_playhouse_m3u8(session, file_id):
     """
     Verilen file_id için çalışan bir Playhouse M3U8 URL'si bulur.
@@ -85,7 +149,8 @@ async def find_playhouse_m3u8(session, file_id):
         m3u8_url = f"https://{domain}.premiumvideo.click/uploads/encode/{file_id}/master.m3u8"
         try:
             # Sadece başlık bilgisi (HEAD) isteği atarak linkin varlığını kontrol etmek daha hızlıdır.
-            async with session.head(m3u8_url, headers={"Referer": movie_referer}, timeout=10, allow_redirects=True) as response:
+            async with session.head(http_cassette.replay_url(m3u8_url), headers={"Referer": movie_referer}, timeout=10, allow_redirects=True) as response:
+                http_cassette.record("HEAD", m3u8_url, response.status, response.headers, b"")
                 if response.status == 200:
                     logger.info(f"[+] Çalışan Playhouse M3U8 bulundu: {m3u8_url}")
                     return m3u8_url
@@ -100,16 +165,11 @@ async def find_playhouse_m3u8(session, file_id):
 async def extract_gujan_m3u8(session, gujan_iframe_url):
     """Gujan iframe'inden M3U8 URL'sini çıkarır."""
     logger.info(f"[*] Gujan iframe işleniyor: {gujan_iframe_url}")
-    content = await fetch_page(session, gujan_iframe_url)
-    if not content:
-        return None
-
-    # M3U8 linkini doğrudan script veya source etiketinden ara
-    m3u8_match = re.search(r'file\s*:\s*["\'](https?://[^"\']+\.m3u8)["\']', content) or \
-                 re.search(r'<source\s+src=["\'](https?://[^"\']+\.m3u8)["\']', content)
-    
-    if m3u8_match:
-        m3u8_url = m3u8_match.group(1)
+    # M3U8 linkini doğrudan script veya source etiketinden ara; file: linki
+    # görülür görülmez sayfanın geri kalanı indirilmez
+    found = await fetch_page(session, gujan_iframe_url, patterns=GUJAN_PATTERNS)
+    if found:
+        m3u8_url = found[1].group(1)
         logger.info(f"[+] Gujan'dan M3U8 bulundu: {m3u8_url}")
         return m3u8_url
         
@@ -162,6 +222,33 @@ async def get_m3u8_from_episode(session, episode_url):
     logger.error(f"[!] Bu bölüm için M3U8 linki bulunamadı: {episode_url}")
     return None
 
+async def resolve_episode(session, episode_url, previous_url=None):
+    """
+    Bölümün M3U8 linkini çözer. Önceki çalıştırmadan bilinen bir link varsa
+    (previous_url) çözüm en fazla STALE_DEADLINE saniye beklenir; başarısız
+    olursa ya da yetişmezse bölüm listeden düşürülmez, eski link kullanılır.
+    Her çalıştırma linki yeniden dener, böylece eski link kendiliğinden yenilenir.
+    """
+    if not previous_url:
+        return await get_m3u8_from_episode(session, episode_url)
+    try:
+        m3u8_url = await asyncio.wait_for(get_m3u8_from_episode(session, episode_url), STALE_DEADLINE)
+    except asyncio.TimeoutError:
+        logger.warning(f"[!] {STALE_DEADLINE}s içinde çözülemedi: {episode_url}")
+        m3u8_url = None
+    if not m3u8_url:
+        logger.warning(f"[!] Önceki çalıştırmadaki link kullanılıyor: {previous_url}")
+        return previous_url
+    return m3u8_url
+
+def load_previous_links(path):
+    """Önceki çalıştırmanın çıktısındaki linkleri tvg-id'ye göre döndürür."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {entry.get_attr("tvg-id"): entry.url for entry in iter_entries(f) if entry.get_attr("tvg-id")}
+    except OSError:
+        return {}
+
 # --- SİTE TARAMA FONKSİYONLARI ---
 
 async def get_content_from_page(session, category_url, page_num):
@@ -245,6 +332,8 @@ async def get_metadata_and_episodes(session, content_url):
 
 async def process_content_list(content_urls, output_filename):
     """Verilen içerik listesini işleyip M3U dosyasına yazar."""
+    # Dosya yeniden yazılmadan önce eski linkler yedek olarak okunur
+    previous_links = load_previous_links(output_filename)
     async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=10)) as session:
         with open(output_filename, "w", encoding="utf-8") as f:
             f.write("#EXTM3U\n")
@@ -257,14 +346,14 @@ async def process_content_list(content_urls, output_filename):
                     logger.info(f"\n[+] İşleniyor: {title}")
                     
                     for ep_info in episodes:
-                        m3u8_url = await get_m3u8_from_episode(session, ep_info['url'])
+                        display_name = f"{title} S{ep_info['season']:02d}E{ep_info['episode']:02d}" if '/dizi/' in content_url else title
+                        tvg_id = sanitize_id(display_name)
+
+                        m3u8_url = await resolve_episode(session, ep_info['url'], previous_links.get(tvg_id))
                         if not m3u8_url:
                             logger.warning(f"[!] M3U8 bulunamadı: S{ep_info['season']} B{ep_info['episode']} - {ep_info['name']}")
                             continue
                         
-                        display_name = f"{title} S{ep_info['season']:02d}E{ep_info['episode']:02d}" if '/dizi/' in content_url else title
-                        tvg_id = sanitize_id(display_name)
-                        
                         f.write(f'#EXTINF:-1 tvg-id="{tvg_id}" tvg-name="{display_name}" tvg-logo="{logo_url}" group-title="{title}",{display_name}\n')
                         f.write(m3u8_url.strip() + "\n")
                         logger.info(f"[✓] Eklendi: {display_name}")
@@ -1,14 +1,20 @@
 import os
 import re
 import json
-import requests
+import atexit
+import threading
 from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 
+import http_client
+from m3u_lib import atomic_write
+
 headers = {
     "User-Agent": "Mozilla/5.0",
 }
 IMDB_CACHE_FILE = "xtream/imdb_vod.json"
+# Bu kadar yeni kayıt birikince dosya yazılır; kalanlar çıkışta yazılır
+IMDB_FLUSH_EVERY = 25
 def load_imdb_cache():
     if os.path.exists(IMDB_CACHE_FILE):
         try:
@@ -19,11 +25,56 @@ def load_imdb_cache():
     return {}
 def save_imdb_cache(cache: dict):
     os.makedirs(os.path.dirname(IMDB_CACHE_FILE), exist_ok=True)
-    with open(IMDB_CACHE_FILE, "w", encoding="utf-8") as f:
+    with atomic_write(IMDB_CACHE_FILE) as f:
         json.dump(cache, f, indent=2, ensure_ascii=False)
+class ImdbCache:
+    """
+    Süreç boyunca bir kez yüklenen IMDb önbelleği. Her film için dosyayı
+    yeniden okuyup yazmak yerine yeni kayıtlar bellekte toplanır ve
+    IMDB_FLUSH_EVERY kayıtta bir ve çıkışta topluca yazılır. İş parçacıkları
+    arasında paylaşılabilir.
+    """
+    def __init__(self, flush_every=IMDB_FLUSH_EVERY):
+        self.flush_every = flush_every
+        self._data = None
+        self._dirty = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+    def _loaded(self):
+        if self._data is None:
+            self._data = load_imdb_cache()
+        return self._data
+    def get(self, key):
+        with self._lock:
+            return self._loaded().get(key)
+    def put(self, key, value):
+        with self._lock:
+            self._loaded()[key] = value
+            self._dirty += 1
+            due = self._dirty >= self.flush_every
+        if due:
+            self.flush()
+    def flush(self):
+        # Aynı anda tek yazım; yazarken okuma/ekleme beklemez
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = dict(self._data)
+                saved = self._dirty
+                self._dirty = 0
+            try:
+                save_imdb_cache(snapshot)
+            except Exception:
+                # Yazılamayan kayıtlar sonraki flush'ta (ya da çıkışta) tekrar denenir
+                with self._lock:
+                    self._dirty += saved
+                raise
+imdb_cache = ImdbCache()
+atexit.register(imdb_cache.flush)
 def get_current_domain():
     url = "https://raw.githubusercontent.com/zerodayip/seriesmovies/refs/heads/main/domain/setfimizle.txt"
-    r = requests.get(url, timeout=10)
+    r = http_client.get(url, timeout=10)
     r.raise_for_status()
     for line in r.text.splitlines():
         line = line.strip()
@@ -32,7 +83,8 @@ def get_current_domain():
     return None
 def get_embed_links(film_url: str):
     results = []
-    with requests.Session() as s:
+    # Film başına ayrı oturum: çerezler filmler arasında paylaşılmaz
+    with http_client.make_session() as s:
         resp = s.get(film_url, headers={**headers, "Referer": film_url})
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "html.parser")
@@ -88,7 +140,7 @@ def get_embed_links(film_url: str):
                 results.append((language, embed_url))
     return results
 def fetch_imdb_poster(imdb_id: str):
-    imdb_resp = requests.get(f"https://www.imdb.com/title/{imdb_id}/", headers=headers, timeout=15)
+    imdb_resp = http_client.get(f"https://www.imdb.com/title/{imdb_id}/", headers=headers, timeout=15)
     imdb_resp.raise_for_status()
     imdb_soup = BeautifulSoup(imdb_resp.text, "html.parser")
     og_image = imdb_soup.find("meta", property="og:image")
@@ -97,10 +149,10 @@ def fetch_imdb_poster(imdb_id: str):
     return None
 def get_imdb_id_and_poster(film_name: str, film_url: str):
     film_name_key = film_name.strip().upper()
-    cache = load_imdb_cache()
-    if film_name_key in cache:
-        return cache[film_name_key]["imdb_id"], cache[film_name_key]["poster"]
-    resp = requests.get(film_url, headers=headers, timeout=15)
+    cached = imdb_cache.get(film_name_key)
+    if cached:
+        return cached["imdb_id"], cached["poster"]
+    resp = http_client.get(film_url, headers=headers, timeout=15)
     resp.raise_for_status()
     soup = BeautifulSoup(resp.text, "html.parser")
     imdb_id = None
@@ -112,8 +164,7 @@ def get_imdb_id_and_poster(film_name: str, film_url: str):
             imdb_id = match.group(1)
             # Cache'de yoksa güncelle
             poster_url = fetch_imdb_poster(imdb_id)
-            cache[film_name_key] = {"imdb_id": imdb_id, "poster": poster_url}
-            save_imdb_cache(cache)
+            imdb_cache.put(film_name_key, {"imdb_id": imdb_id, "poster": poster_url})
     return imdb_id, poster_url
 def scrape_movies_all_pages(start_page_url):
     with sync_playwright() as p:
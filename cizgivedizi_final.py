@@ -6,6 +6,8 @@ cizgivedizi_final.py
 - ÇizgiVeDizi scraper mantığı + toplu indirme + M3U + Özet Raporu oluşturma.
 - Tüm dizileri çeker, her dizi için JSON ve M3U dosyaları oluşturur.
 - İşlem sonunda 'output' klasörüne bir özet README.md dosyası yazar.
+- İstek süreleri aşama ve host bazında konsola yazılır; HTTP_STATS_REPORT
+  verilirse JSON rapor o dosyaya kaydedilir (output klasörüne değil).
 """
 
 from __future__ import annotations
@@ -24,6 +26,12 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 from bs4 import BeautifulSoup
 
+import http_client
+import http_stats
+from http_fetch import fetch_many
+from m3u_delta import write_playlist
+from m3u_lib import M3UEntry
+
 # =======================
 #  Configuration
 # =======================
@@ -62,20 +70,16 @@ class EpisodeLinks:
 #  Scraper Core
 # =======================
 
-def _make_session() -> requests.Session:
-    s = requests.Session()
-    s.headers.update(DEFAULT_HEADERS)
-    return s
+def _make_session(pool_size: int = http_client.POOL_SIZE) -> requests.Session:
+    return http_client.make_session(headers=DEFAULT_HEADERS, pool_size=pool_size)
 
 def _fix_url(u: str) -> str:
     return urljoin(BASE_URL + "/", u)
 
-def get_text_map(path: str, session: requests.Session) -> Dict[str, str]:
-    url = _fix_url(path)
-    r = session.get(url, timeout=30)
-    r.encoding = "utf-8"
-    r.raise_for_status()
-    text = r.text.replace("\r\n", "\n")
+TEXT_MAPS = ("/dizi/isim.txt", "/dizi/poster.txt", "/dizi/ozet.txt", "/dizi/etiket.txt")
+
+def _parse_text_map(text: str) -> Dict[str, str]:
+    text = text.replace("\r\n", "\n")
     lines = [ln.strip() for ln in text.split("\n") if ln.strip() and not ln.strip().startswith(("#", "//"))]
     pairs = {}
     for ln in lines:
@@ -86,11 +90,19 @@ def get_text_map(path: str, session: requests.Session) -> Dict[str, str]:
                 pairs[key] = value
     return pairs
 
+def get_text_map(path: str, session: requests.Session) -> Dict[str, str]:
+    r = session.get(_fix_url(path), timeout=30)
+    r.encoding = "utf-8"
+    r.raise_for_status()
+    return _parse_text_map(r.text)
+
 def list_series(session: requests.Session) -> List[Series]:
-    isim = get_text_map("/dizi/isim.txt", session)
-    poster = get_text_map("/dizi/poster.txt", session)
-    plot = get_text_map("/dizi/ozet.txt", session)
-    tags = get_text_map("/dizi/etiket.txt", session)
+    # Dört metin dosyası birbirinden bağımsız; tek seferde eşzamanlı indirilir
+    results = fetch_many([_fix_url(p) for p in TEXT_MAPS], per_host=len(TEXT_MAPS),
+                         timeout=30, encoding="utf-8", session=session)
+    for r in results:
+        r.raise_for_status()
+    isim, poster, plot, tags = (_parse_text_map(r.text) for r in results)
     return [
         Series(
             slug=slug, title=title, url=f"{BASE_URL}/dizi/{slug}/",
@@ -130,15 +142,16 @@ def sanitize_filename(name: str) -> str:
     return re.sub(r'[^A-Za-z0-9._-]+', '_', name)
 
 def generate_m3u_for_series(series_data: dict, output_path: str) -> bool:
-    content = ["#EXTM3U"]
+    entries: List[M3UEntry] = []
     for ep in series_data.get("episodes", []):
         if not (src := ep.get("iframe_src")): continue
         s, e, t = ep.get("season"), ep.get("episode"), ep.get("title", "Bölüm")
         prefix = f"S{s:02d}E{e:02d}" if isinstance(s, int) and isinstance(e, int) else f"Bölüm {e or ''}"
-        content.append(f"#EXTINF:-1,{prefix.strip()} - {t}")
-        content.append(src)
-    if len(content) > 1:
-        with open(output_path, "w", encoding="utf-8") as f: f.write("\n".join(content))
+        entries.append(M3UEntry(f"#EXTINF:-1,{prefix.strip()} - {t}", src))
+    if entries:
+        # Bölümler değişmediyse dosya yeniden yazılmaz
+        with write_playlist(output_path, delta_file=False, compress=False) as writer:
+            writer.write_all(entries)
         return True
     return False
 
@@ -158,15 +171,18 @@ def generate_summary_readme(out_dir: str, stats: dict):
         f.write("\n".join(content))
 
 def dump_series(slug: str, sess: requests.Session, include_iframe: bool) -> dict:
-    all_meta = {s.slug: s for s in list_series(sess)}
+    with http_stats.stage("liste"):
+        all_meta = {s.slug: s for s in list_series(sess)}
     meta = all_meta.get(slug) or Series(slug=slug, title=slug, url=f"{BASE_URL}/dizi/{slug}/")
-    episodes = get_episodes(slug, sess)
+    with http_stats.stage("bolumler"):
+        episodes = get_episodes(slug, sess)
     result_eps = []
     for e in episodes:
         ep_dict = {"title": e.title, "url": e.url, "season": e.season, "episode": e.episode}
         if include_iframe:
             try:
-                links = get_episode_links(e.url, sess)
+                with http_stats.stage("iframe"):
+                    links = get_episode_links(e.url, sess)
                 ep_dict.update({"iframe_src": links.iframe_src, "host": links.host})
             except Exception:
                 ep_dict.update({"iframe_src": None, "host": None})
@@ -180,8 +196,12 @@ def cmd_dump_all(args):
     m3u_dir = os.path.join(out_dir, "m3u")
     if args.m3u: os.makedirs(m3u_dir, exist_ok=True)
     
-    sess = _make_session()
-    slugs = [s.slug for s in list_series(sess)]
+    # --workers bir tavandır; siteye giden istek sayısını host_limit ayarlar
+    http_client.configure_host(urlparse(BASE_URL).netloc, int(args.workers))
+    sess = _make_session(pool_size=max(http_client.POOL_SIZE, int(args.workers)))
+    started = time.perf_counter()
+    with http_stats.stage("liste"):
+        slugs = [s.slug for s in list_series(sess)]
     print(f"[i] Toplam {len(slugs)} dizi bulundu. İşlem başlıyor...")
     
     stats = {"total_series": len(slugs), "processed_series": 0, "m3u_created": 0, "errors": 0}
@@ -220,13 +240,16 @@ def cmd_dump_all(args):
 
     generate_summary_readme(out_dir, stats)
     print("\n[+] İşlem tamamlandı. Özet raporu oluşturuldu.")
+    # Süreler her çalıştırmada değişir; commit'lenen README yerine konsola yazılır
+    print(f"[i] Toplam süre: {time.perf_counter() - started:.1f} sn\n")
+    print(http_stats.histogram_markdown())
 
 def main():
     p = argparse.ArgumentParser(description="ÇizgiVeDizi - Toplu JSON, M3U ve Rapor Çıkarıcı")
     p_dump = p.add_subparsers().add_parser("dump-all", help="Tüm veriyi çek ve dosyaları oluştur")
     p_dump.set_defaults(func=cmd_dump_all)
     p_dump.add_argument("--out-dir", default="output", help="Çıktı klasörü")
-    p_dump.add_argument("--workers", default="5", help="Eşzamanlı iş parçacığı")
+    p_dump.add_argument("--workers", default="5", help="Eşzamanlı iş parçacığı (site yavaşlarsa istekler otomatik azaltılır)")
     p_dump.add_argument("--m3u", action="store_true", help="M3U çalma listeleri oluştur")
     p_dump.add_argument("--no-iframe", action="store_true", help="Iframe linklerini çözme (M3U için gerekli)")
 
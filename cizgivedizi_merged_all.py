@@ -37,6 +37,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 from bs4 import BeautifulSoup
 
+import http_client
+from http_fetch import fetch_many
+
 # =======================
 #  Configuration
 # =======================
@@ -53,7 +56,6 @@ DEFAULT_HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
     "Referer": BASE_URL + "/",
-    "Connection": "close",
 }
 
 # =======================
@@ -87,11 +89,9 @@ class EpisodeLinks:
 #  Scraper Core
 # =======================
 
-def _make_session() -> requests.Session:
-    """Creates a new requests session with default headers."""
-    s = requests.Session()
-    s.headers.update(DEFAULT_HEADERS)
-    return s
+def _make_session(pool_size: int = http_client.POOL_SIZE) -> requests.Session:
+    """Creates a pooled keep-alive session with default headers."""
+    return http_client.make_session(headers=DEFAULT_HEADERS, pool_size=pool_size)
 
 def _fix_url(u: str) -> str:
     """Ensures a URL is absolute."""
@@ -119,25 +119,32 @@ def _smart_split_kv(line: str):
         return parts[0].lstrip("|"), " ".join(parts[1:]).strip()
     return None
 
+TEXT_MAPS = ("/dizi/isim.txt", "/dizi/poster.txt", "/dizi/ozet.txt", "/dizi/etiket.txt")
+
+def _parse_text_map(text: str) -> Dict[str, str]:
+    """Parses a key/value text file from the site into a dictionary."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [ln for ln in text.split("\n") if ln.strip()]
+    pairs = [kv for ln in lines if (kv := _smart_split_kv(ln)) and kv[0] != ""]
+    return dict(pairs)
+
 def get_text_map(path: str, session: Optional[requests.Session] = None) -> Dict[str, str]:
     """Fetches a text file from the site and parses it into a dictionary."""
     sess = session or _make_session()
-    url = _fix_url(path)
-    r = sess.get(url, timeout=20)
+    r = sess.get(_fix_url(path), timeout=20)
     r.encoding = "utf-8"
     r.raise_for_status()
-    text = r.text.replace("\r\n", "\n").replace("\r", "\n")
-    lines = [ln for ln in text.split("\n") if ln.strip()]
-    pairs = [kv for ln in lines if (kv := _smart_split_kv(ln)) and kv[0] != ""]
-    return dict(pairs)
+    return _parse_text_map(r.text)
 
 def list_series(session: Optional[requests.Session] = None) -> List[Series]:
     """Lists all available series with their metadata."""
     sess = session or _make_session()
-    isim = get_text_map("/dizi/isim.txt", sess)
-    poster = get_text_map("/dizi/poster.txt", sess)
-    plot = get_text_map("/dizi/ozet.txt", sess)
-    tags = get_text_map("/dizi/etiket.txt", sess)
+    # The four text files are independent; fetch them in one concurrent batch
+    results = fetch_many([_fix_url(p) for p in TEXT_MAPS], per_host=len(TEXT_MAPS),
+                         timeout=20, encoding="utf-8", session=sess)
+    for r in results:
+        r.raise_for_status()
+    isim, poster, plot, tags = (_parse_text_map(r.text) for r in results)
 
     out: List[Series] = []
     for slug, title in isim.items():
@@ -291,7 +298,11 @@ def cmd_dump_all(args):
         m3u_dir = os.path.join(out_dir, "m3u")
         os.makedirs(m3u_dir, exist_ok=True)
 
-    sess = _make_session()
+    # İş parçacığı sayısı bir tavandır; siteye aynı anda giden istek sayısını
+    # host_limit gecikme ve hata oranına göre bu değerin altında ayarlar
+    http_client.configure_host(urlparse(BASE_URL).netloc, int(args.workers))
+    # Her iş parçacığının kendi bağlantısı olacak kadar büyük havuz
+    sess = _make_session(pool_size=max(http_client.POOL_SIZE, int(args.workers)))
     all_series = list_series(sess)
     slugs = [s.slug for s in all_series]
 
@@ -352,7 +363,7 @@ def main():
 
     p_dump = sub.add_parser("dump-all", help="Tüm dizileri çek, JSON ve/veya M3U dosyaları oluştur")
     p_dump.add_argument("--out-dir", default="output", help="Çıktı klasörü (varsayılan: ./output)")
-    p_dump.add_argument("--workers", default="4", help="Eşzamanlı iş parçacığı sayısı (varsayılan: 4)")
+    p_dump.add_argument("--workers", default="4", help="Eşzamanlı iş parçacığı sayısı; site yavaşlarsa istekler otomatik azaltılır (varsayılan: 4)")
     p_dump.add_argument("--no-iframe", action="store_true", help="İframe linklerini çözme (daha hızlı, M3U için gereklidir)")
     p_dump.add_argument("--m3u", action="store_true", help="JSON dosyalarına ek olarak M3U çalma listeleri oluşturur")
     p_dump.set_defaults(func=cmd_dump_all)
@@ -1,7 +1,11 @@
 import re
 import certifi
 import os
-import requests
+import sys
+
+# Shared pooled HTTP client lives in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client
 
 # Add the channel logo constant
 CHANNEL_LOGO = "https://github.com/BuddyChewChew/gen-playlist/blob/main/docs/ch.png?raw=true"
@@ -40,7 +44,7 @@ def server1(i, name):
         "X-Requested-With": "XMLHttpRequest",
     }
 
-    response = requests.get(url, headers=headers, verify=certifi.where())
+    response = http_client.get(url, headers=headers, verify=certifi.where())
 
     # Use regex to extract the source URL
     match = re.search(r'file:\s*"([^"]+playlist\.m3u8[^"]*)"', response.text)
@@ -55,7 +59,7 @@ def server1(i, name):
 def server2(hash, name):
     print("Running Server 2")
     try:
-        res = requests.post(
+        res = http_client.post(
             f"https://adult-tv-channels.click/C1Ep6maUdBIeKDQypo7a/{hash}",
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             timeout=10
@@ -73,7 +77,7 @@ def server3(hash, name):
     print("Running Server 3")
     try:
         url = f"https://fuckflix.click/8RLxsc2AW1q8pvyvjqIQ"
-        res = requests.post(
+        res = http_client.post(
             f"{url}/{hash}", 
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             timeout=10
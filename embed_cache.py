@@ -0,0 +1,202 @@
+# embed_cache.py
+# Çözülmüş embed -> m3u8 eşlemeleri için kalıcı, süreli (TTL) önbellek.
+#
+# Kayıtlar ".http_cache/embed_m3u8.jsonl" dosyasına satır satır eklenir
+# (append-only). Her satır bir URL'nin son durumudur; okurken aynı URL'nin
+# son satırı geçerlidir. Dosya iş akışında depoya işlendiğinden her
+# çalıştırma yalnızca değişen eşlemeler kadar satır ekler; ölü satırlar
+# canlı kayıtları belirgin biçimde aşınca dosya atomik olarak sıkıştırılır.
+#
+#   - Olumlu kayıt: bulunan m3u8 TTL süresince (±%10 sapmayla, böylece tüm
+#     kayıtların süresi aynı çalıştırmada dolmaz) yeniden çözülmez.
+#   - Olumsuz kayıt: sayfa açıldı ama link yoksa, embed bir süre tekrar
+#     denenmez. Bekleme her başarısızlıkta ikiye katlanır
+#     (NEGATIVE_TTL, 2x, 4x ... MAX_NEGATIVE_TTL).
+#   - Ağ hataları kaydedilmez; geçici sorunlar ölü embed sayılmaz.
+#
+# Son çalışan link (stale) süresi dolsa ya da sonraki denemelerde link
+# bulunamasa da son başarılı çözümden sonra STALE_KEEP süresince saklanır;
+# yeni çözüm başarısız olursa ya da zamanında bitmezse çıktıda embed yerine
+# bu link kullanılır (stale-while-revalidate). Bu süreyi aşan kayıtlar
+# sıkıştırmada atılır. retain() ile listede artık olmayan embed'lerin
+# kayıtları bırakılır.
+
+import json
+import os
+import random
+import threading
+import time
+
+from m3u_lib import atomic_write
+
+CACHE_PATH = os.path.join(".http_cache", "embed_m3u8.jsonl")
+
+TTL = 3 * 86400
+TTL_JITTER = 0.1
+NEGATIVE_TTL = 6 * 3600
+MAX_NEGATIVE_TTL = 14 * 86400
+STALE_KEEP = 30 * 86400
+
+# Ölü satır sayısı canlı kayıtların bu katını (ve en az COMPACT_MIN) aşınca sıkıştır
+COMPACT_RATIO = 1.0
+COMPACT_MIN = 200
+
+
+class EmbedCache:
+    """Embed URL'si anahtarlı, iş parçacığı güvenli kalıcı önbellek."""
+
+    def __init__(self, path=CACHE_PATH, ttl=TTL, negative_ttl=NEGATIVE_TTL,
+                 max_negative_ttl=MAX_NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_negative_ttl = max_negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self._records = {}
+        self._lines = 0
+        self._pending = []
+        self._rewrite = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # yarım kalmış son satır
+                    self._lines += 1
+                    self._records[record["url"]] = record
+        except OSError:
+            pass
+
+    def lookup(self, url, now=None):
+        """
+        (bulundu, m3u8) döndürür. Süresi dolmamış olumlu kayıtta (True, link),
+        bekleme süresi sürmekte olan olumsuz kayıtta (True, None), aksi halde
+        (False, None): URL yeniden çözülmelidir.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            record = self._records.get(url)
+            if record is not None and now < record["at"] + record["ttl"]:
+                if record.get("m3u8"):
+                    self.hits += 1
+                else:
+                    self.negative_hits += 1
+                return True, record.get("m3u8")
+            self.misses += 1
+            return False, None
+
+    def stale(self, url, now=None):
+        """
+        Süresi dolmuş ya da sonradan olumsuzlanmış olsa da son çalışan m3u8;
+        son başarılı çözümün üzerinden STALE_KEEP geçtiyse None.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            record = self._records.get(url)
+        if record is None:
+            return None
+        link, good_at = _last_good(record)
+        return link if link and now < good_at + STALE_KEEP else None
+
+    def use_stale(self, url, now=None):
+        """stale() ile aynı; link döndüyse çıktıda kullanıldığı sayılır."""
+        link = self.stale(url, now)
+        if link:
+            with self._lock:
+                self.stale_served += 1
+        return link
+
+    def put(self, url, m3u8, now=None):
+        """Başarılı çözümü kaydeder."""
+        ttl = int(self.ttl * random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER))
+        self._store({"url": url, "m3u8": m3u8, "at": int(time.time() if now is None else now),
+                     "ttl": ttl, "failures": 0})
+
+    def fail(self, url, now=None):
+        """Link bulunamadığını kaydeder; bekleme süresi her seferinde ikiye katlanır."""
+        with self._lock:
+            previous = self._records.get(url)
+        failures = (previous.get("failures", 0) if previous and not previous.get("m3u8") else 0) + 1
+        ttl = min(self.max_negative_ttl, self.negative_ttl * 2 ** (failures - 1))
+        record = {"url": url, "m3u8": None, "at": int(time.time() if now is None else now),
+                  "ttl": ttl, "failures": failures}
+        if previous:
+            # Son çalışan link olumsuz kayıtta da taşınır
+            link, good_at = _last_good(previous)
+            if link:
+                record["stale"] = link
+                record["stale_at"] = good_at
+        self._store(record)
+
+    def _store(self, record):
+        with self._lock:
+            # Değer aynı olsa da yazılır; yenilenen süreyi sonraki çalıştırma bilmeli
+            self._records[record["url"]] = record
+            self._pending.append(record)
+
+    def save(self, now=None):
+        """Bekleyen kayıtları dosyaya ekler; gerekirse dosyayı sıkıştırır."""
+        now = time.time() if now is None else now
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending and not self._rewrite:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._lines += len(pending)
+            live = len(self._records)
+            if self._rewrite or self._lines - live > max(COMPACT_MIN, live * COMPACT_RATIO):
+                self._compact(now)
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                for record in pending:
+                    f.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
+
+    def _compact(self, now):
+        keep = {url: r for url, r in self._records.items()
+                if now < max(r["at"] + r["ttl"], _last_good(r)[1]) + STALE_KEEP}
+        with atomic_write(self.path) as f:
+            for url in sorted(keep):
+                f.write(json.dumps(keep[url], ensure_ascii=False, sort_keys=True) + "\n")
+        self._records = keep
+        self._lines = len(keep)
+        self._rewrite = False
+
+    def has_expired(self, now=None):
+        """Yeniden çözülmesi gereken (süresi dolmuş) kayıt varsa True."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return any(now >= r["at"] + r["ttl"] for r in self._records.values())
+
+    def retain(self, urls):
+        """Yalnızca verilen URL'lerin kayıtlarını tutar; dosya sıkıştırılır."""
+        urls = set(urls)
+        with self._lock:
+            dropped = [url for url in self._records if url not in urls]
+            for url in dropped:
+                del self._records[url]
+            if dropped:
+                # Sonraki save() dosyayı yeniden yazar
+                self._rewrite = True
+                self._pending = [r for r in self._pending if r["url"] in urls]
+        return len(dropped)
+
+    def summary(self):
+        return (f"önbellekten {self.hits}, ölü olarak atlanan {self.negative_hits}, "
+                f"yeniden çözülen {self.misses}, eski linkle doldurulan {self.stale_served}")
+
+
+def _last_good(record):
+    """Kayıttaki son çalışan link ve çözüldüğü zaman."""
+    if record.get("m3u8"):
+        return record["m3u8"], record["at"]
+    return record.get("stale"), record.get("stale_at", 0)
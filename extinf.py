@@ -0,0 +1,194 @@
+# extinf.py
+# #EXTINF satırları için tek geçişli, regex kullanmayan özellik ayrıştırıcı.
+#
+#   #EXTINF:-1 tvg-id="X" group-title="Filmler",Başlık
+#   \________/ \_______/ \__________________/ \____/
+#     boşluk     özellik        özellik        başlık
+#
+# Satır; özellikler arasındaki ham metin parçaları (boşluklar), anahtarlar ve
+# değerler olarak saklanır. Böylece tek bir özellik değiştirildiğinde satır
+# yeniden ayrıştırılmadan, orijinal biçimi korunarak yeniden yazılabilir.
+# Virgülden önceki kısım (özellik öneki) birçok satırda tekrarlandığı için
+# ayrıştırma sonuçları LRU önbellekte tutulur.
+
+from functools import lru_cache
+
+EXTINF = "#EXTINF:"
+
+_CACHE_SIZE = 8192
+
+
+def _split_quotes(text):
+    """
+    Metni tırnaklardan böler; çift indeksler tırnak dışı, tek indeksler tırnak
+    içidir. Ters bölü ile kaçırılmış tırnaklar bölme noktası sayılmaz.
+    """
+    parts = text.split('"')
+    if '\\"' in text:
+        merged = [parts[0]]
+        for part in parts[1:]:
+            if merged[-1].endswith("\\"):
+                merged[-1] += '"' + part
+            else:
+                merged.append(part)
+        parts = merged
+    return parts
+
+
+def _title_comma(line):
+    """Tırnak dışındaki ilk virgülün indeksini bulur (yoksa -1)."""
+    if '"' not in line:
+        return line.find(",")
+    parts = _split_quotes(line)
+    offset = 0
+    for i in range(0, len(parts), 2):
+        comma = parts[i].find(",")
+        if comma >= 0:
+            return offset + comma
+        # Tırnak dışı parça + tırnak içi parça + iki tırnak karakteri
+        offset += len(parts[i]) + (len(parts[i + 1]) + 2 if i + 1 < len(parts) else 0)
+    return -1
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _tokenize_head(head):
+    """
+    Virgülden önceki özellik önekini (boşluklar, anahtarlar, değerler) üçlüsüne
+    ayırır; len(boşluklar) == len(anahtarlar) + 1.
+    """
+    parts = _split_quotes(head)
+    if not len(parts) & 1:
+        # Kapanmamış son tırnak ham metin olarak kalır
+        parts[-2:] = ['"'.join(parts[-2:])]
+    gaps, keys, values = [], [], []
+    gap = parts[0]
+    for i in range(1, len(parts), 2):
+        outside = gap
+        if outside.endswith("="):
+            key_start = outside.rfind(" ") + 1
+            if not key_start and outside.startswith(EXTINF):
+                key_start = len(EXTINF)
+            key = outside[key_start:-1]
+            if key:
+                gaps.append(outside[:key_start])
+                keys.append(key)
+                values.append(parts[i])
+                gap = parts[i + 1]
+                continue
+        gap = f'{outside}"{parts[i]}"{parts[i + 1]}'
+    gaps.append(gap)
+    return tuple(gaps), tuple(keys), tuple(values)
+
+
+def _tokenize(line):
+    comma = _title_comma(line)
+    if comma < 0:
+        return _tokenize_head(line) + (None,)
+    return _tokenize_head(line[:comma]) + (line[comma + 1:],)
+
+
+class ExtInf:
+    """Ayrıştırılmış bir #EXTINF satırı."""
+
+    __slots__ = ("_line", "_gaps", "_keys", "_values", "_title")
+
+    def __init__(self, line):
+        self._line = line
+        self._gaps, self._keys, self._values, self._title = _tokenize(line)
+
+    @property
+    def duration(self):
+        """#EXTINF: ile ilk özellik arasındaki süre değeri (genellikle -1)."""
+        head = self._gaps[0]
+        if head.startswith(EXTINF):
+            head = head[len(EXTINF):]
+        parts = head.split()
+        return parts[0] if parts else ""
+
+    @property
+    def title(self):
+        """Görünen ad (virgülden sonraki kısım, boşluklar kırpılmış)."""
+        return (self._title or "").strip()
+
+    @property
+    def attrs(self):
+        """Özellikleri sözlük olarak döndürür; tekrarlanan anahtarda ilki geçerlidir."""
+        attrs = {}
+        for key, value in zip(self._keys, self._values):
+            attrs.setdefault(key, value)
+        return attrs
+
+    def get(self, key, default=None):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None and key not in self._keys:
+            raise KeyError(key)
+        return value
+
+    def set(self, key, value):
+        """
+        Tek bir özelliği değiştirir (yoksa başlıktan önce ekler). Satır yeniden
+        ayrıştırılmaz; sonraki str() çağrısı parçaları birleştirir.
+        """
+        try:
+            i = self._keys.index(key)
+        except ValueError:
+            last = self._gaps[-1]
+            stripped = last.rstrip()
+            self._keys += (key,)
+            self._values += (value,)
+            self._gaps = self._gaps[:-1] + (stripped + " ", last[len(stripped):])
+        else:
+            if self._values[i] == value:
+                return
+            self._values = self._values[:i] + (value,) + self._values[i + 1:]
+        self._line = None
+
+    def replace(self, key, value):
+        """
+        Var olan tüm key özelliklerinin değerini değiştirir; özellik yoksa
+        eklemez. Satır değiştiyse True döndürür.
+        """
+        values = tuple(value if k == key else v for k, v in zip(self._keys, self._values))
+        if values == self._values:
+            return False
+        self._values = values
+        self._line = None
+        return True
+
+    def set_title(self, title):
+        self._title = title
+        self._line = None
+
+    def __str__(self):
+        if self._line is None:
+            parts = [self._gaps[0]]
+            for key, value, gap in zip(self._keys, self._values, self._gaps[1:]):
+                parts.append(f'{key}="{value}"')
+                parts.append(gap)
+            if self._title is not None:
+                parts.append(",")
+                parts.append(self._title)
+            self._line = "".join(parts)
+        return self._line
+
+    def __repr__(self):
+        return f"ExtInf({str(self)!r})"
+
+
+def parse_extinf(line):
+    """Bir #EXTINF satırını ExtInf nesnesine ayrıştırır."""
+    return ExtInf(line)
+
+
+def cache_info():
+    """Ayrıştırma önbelleğinin isabet istatistiklerini döndürür."""
+    return _tokenize_head.cache_info()
@@ -1,22 +1,27 @@
-import urllib.request
-import json
 import urllib.parse
 
+import http_client
+from m3u_delta import write_playlist
+from m3u_lib import M3UEntry
+from m3u_shard import shard_summary, write_shards
+
+# Ülke başına ayrı listeler ve bunlara bağlanan radio/index.m3u
+SHARD_DIR = 'radio'
+
 print("📻 Radyo istasyonları alınıyor...")
 try:
     # TÜM istasyonları al, limitsiz
     url = 'https://de1.api.radio-browser.info/json/stations?hidebroken=true&order=votes&reverse=true'
-    req = urllib.request.Request(
+    response = http_client.get(
         url,
         headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/json'
-        }
+        },
+        timeout=120
     )
-
-    with urllib.request.urlopen(req, timeout=120) as response:
-        data = response.read().decode('utf-8')
-        stations = json.loads(data)
+    response.raise_for_status()
+    stations = response.json()
 
     print(f"✅ {len(stations)} istasyon alındı")
 
@@ -62,7 +67,6 @@ for station in stations:
         continue
 
 print("📝 M3U dosyası oluşturuluyor...")
-m3u_output = '#EXTM3U x-tvg-url=""\n\n'
 
 # Önce Türkiye'yi al, sonra diğer ülkeleri alfabetik sırala
 country_names = sorted(countries.keys())
@@ -73,30 +77,47 @@ elif 'Türkiye' in country_names:
     country_names.remove('Türkiye')
     country_names.insert(0, 'Türkiye')
 
-# Ülke kategorilerine göre sırala ve ekle
+# Ülke başına girişleri bir kez oluştur; hem tam liste hem parçalar bunları kullanır
+country_entries = {}
 for country in country_names:
-    m3u_output += f'#EXTINF:-1 tvg-id="" tvg-logo="" group-title="{country}",{country}\n'
-    m3u_output += f'#EXTGRP:{country}\n\n'
-
     # İstasyonları oylara göre sırala
     stations_sorted = sorted(countries[country], key=lambda x: x['votes'], reverse=True)
 
+    entries = country_entries[country] = []
     for i, station in enumerate(stations_sorted):
         safe_name = station['name'].replace('"', '\\"').replace(',', '')
         logo = station['logo'].replace('"', '\\"') if station['logo'] else ''
 
-        m3u_output += f'#EXTINF:-1 tvg-id="{country}_{i}" tvg-name="{safe_name}" tvg-logo="{logo}" group-title="{country}",{safe_name}\n'
-        m3u_output += '#EXTVLCOPT:http-user-agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"\n'
-        m3u_output += f'{station["url"]}\n\n'
+        entries.append(M3UEntry(
+            f'#EXTINF:-1 tvg-id="{country}_{i}" tvg-name="{safe_name}" tvg-logo="{logo}" group-title="{country}",{safe_name}',
+            station["url"],
+            ['#EXTVLCOPT:http-user-agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"'],
+        ))
 
-# Dosyaya yaz
+# Dosyaya yaz (önceki listeyle aynıysa dosyaya dokunulmaz)
 try:
-    with open('global_radio.m3u', 'w', encoding='utf-8') as f:
-        f.write(m3u_output)
-
-    print("✅ M3U dosyası başarıyla oluşturuldu!")
+    with write_playlist('global_radio.m3u', header='#EXTM3U x-tvg-url=""') as writer:
+        writer.write_raw('')
+
+        # Ülke kategorilerine göre sırala ve ekle
+        for country in country_names:
+            writer.write_raw(f'#EXTINF:-1 tvg-id="" tvg-logo="" group-title="{country}",{country}')
+            writer.write_raw(f'#EXTGRP:{country}')
+            writer.write_raw('')
+
+            for entry in country_entries[country]:
+                writer.write(entry)
+                writer.write_raw('')
+
+    shards = write_shards(SHARD_DIR, country_entries, header='#EXTM3U x-tvg-url=""')
+
+    if writer.has_changes():
+        print(f"✅ M3U dosyası başarıyla oluşturuldu! ({writer.summary()})")
+    else:
+        print("✅ M3U dosyası güncel, değişiklik yok.")
+    print(f"🗂️ {SHARD_DIR}/: {shard_summary(shards)}")
     print(f"📊 Toplam {len(countries)} ülke, {sum(len(stations) for stations in countries.values())} istasyon")
 
 except Exception as e:
     print(f"❌ Dosya yazma hatası: {e}")
-    exit(1)
\ No newline at end of file
+    exit(1)
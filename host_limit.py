@@ -0,0 +1,226 @@
+# host_limit.py
+# Host başına uyarlanabilir eşzamanlılık sınırı (AIMD).
+#
+# Sabit "--workers 5" hızlı host'lar için çekingen, yavaş olanlar için 429 ve
+# zaman aşımı sebebidir. Burada her host için ayrı bir sınır tutulur:
+#   - başarılı ve gecikmesi normal her yanıt sınırı artırır; ilk düşüşe kadar
+#     yanıt başına +1 (yavaş başlangıç), sonra sınır başına +1 (toplamsal artış),
+#   - 429/502/503/504, zaman aşımı ve bağlantı hatası ya da gecikmenin taban
+#     gecikmenin belirgin üstüne çıkması sınırı yarıya indirir (çarpımsal azalış),
+#   - sınır her zaman [floor, ceiling] aralığında kalır; ceiling, yapılandırılan
+#     üst sınırdır (configure() ya da http_client.configure_host()).
+# Aynı azalış anında yoldaki istekler yeniden azalış tetiklemez; bir hata
+# dalgası sınırı tek seferde 1'e düşürmez.
+#
+# Kayıt süreç geneli ve host'a göredir; http_client oturumları ve
+# http_fetch.fetch_many aynı sınırı paylaşır, böylece öğrenilen değer
+# betiğin tüm istek yollarında geçerlidir.
+#
+#   limit = host_limit.for_url(url)
+#   with limit.slot() as slot:
+#       response = session.get(url)
+#       slot.status = response.status_code
+#
+# asyncio tarafında "token = await limit.acquire_async()" ve ardından
+# limit.release(token, status) kullanılır.
+#
+# HTTP_ADAPTIVE_DISABLE tanımlıysa sınırlar yalnızca ceiling olarak uygulanır.
+
+import asyncio
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# http_client.POOL_SIZE ile aynı: havuzdaki bağlantı sayısını aşmaz
+DEFAULT_CEILING = 16
+INITIAL_LIMIT = 4
+FLOOR = 1
+# acquire_async bekleme aralığı; sınır iş parçacıklarıyla paylaşıldığından
+# olay döngüsü bir koşul değişkenine bağlanamaz, kısa aralıklarla yeniden dener
+ASYNC_POLL = 0.02
+
+# Gecikme bu katı (ve en az LATENCY_SLACK saniye fazlasını) aşarsa tıkanma sayılır
+LATENCY_FACTOR = 3.0
+LATENCY_SLACK = 0.5
+# Taban gecikme her örnekte bu oranda yukarı kayar; ağ koşulları değişince eski
+# en düşük değer sonsuza kadar referans kalmaz
+BASELINE_DRIFT = 1.01
+
+OVERLOAD_STATUS = frozenset((429, 502, 503, 504))
+
+DISABLED = bool(os.environ.get("HTTP_ADAPTIVE_DISABLE"))
+
+_lock = threading.Lock()
+_limits = {}
+_ceilings = {}
+
+
+class _Slot:
+    """slot() içinde çağıranın sonucu bildirdiği nesne."""
+
+    __slots__ = ("status", "error")
+
+    def __init__(self):
+        self.status = None
+        self.error = False
+
+
+class AIMDLimit:
+    """Tek bir host için uyarlanabilir eşzamanlılık sınırı."""
+
+    def __init__(self, host, ceiling=DEFAULT_CEILING, floor=FLOOR, initial=INITIAL_LIMIT):
+        self.host = host
+        self.ceiling = max(floor, ceiling)
+        self.floor = floor
+        self.limit = float(min(self.ceiling, max(floor, initial)))
+        self.in_flight = 0
+        self.baseline = None
+        self.successes = 0
+        self.overloads = 0
+        self.decreases = 0
+        self._slow_start = True
+        self._epoch = 0
+        self._cond = threading.Condition()
+
+    @property
+    def allowed(self):
+        if DISABLED:
+            return self.ceiling
+        return max(self.floor, min(self.ceiling, int(self.limit)))
+
+    def try_acquire(self):
+        """Yer varsa alır ve bir belirteç döndürür; yoksa None (beklemez)."""
+        with self._cond:
+            if self.in_flight >= self.allowed:
+                return None
+            self.in_flight += 1
+            return self._epoch, time.perf_counter()
+
+    def acquire(self):
+        """Yer açılana kadar bekler; release()'e verilecek belirteci döndürür."""
+        with self._cond:
+            while self.in_flight >= self.allowed:
+                self._cond.wait()
+            self.in_flight += 1
+            return self._epoch, time.perf_counter()
+
+    async def acquire_async(self):
+        """acquire'ın olay döngüsünü bloklamayan karşılığı."""
+        while True:
+            token = self.try_acquire()
+            if token is not None:
+                return token
+            await asyncio.sleep(ASYNC_POLL)
+
+    def release(self, token, status=None, error=False):
+        """
+        İsteğin sonucunu bildirir. status HTTP durum kodu, error ise yanıt
+        alınamadığını (zaman aşımı, bağlantı hatası) belirtir.
+        """
+        epoch, started = token
+        latency = time.perf_counter() - started
+        with self._cond:
+            self.in_flight -= 1
+            if error or status in OVERLOAD_STATUS:
+                self.overloads += 1
+                self._decrease(epoch)
+            elif self._congested(latency):
+                self._decrease(epoch)
+            else:
+                self.successes += 1
+                self._increase()
+            self._cond.notify_all()
+
+    def _congested(self, latency):
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+            return False
+        threshold = max(self.baseline * LATENCY_FACTOR, self.baseline + LATENCY_SLACK)
+        self.baseline *= BASELINE_DRIFT
+        return latency > threshold
+
+    def _increase(self):
+        if self._slow_start:
+            self.limit = min(self.ceiling, self.limit + 1)
+        else:
+            self.limit = min(self.ceiling, self.limit + 1 / self.limit)
+
+    def _decrease(self, epoch):
+        # Son azalıştan önce başlamış istekler eski sınırın sonucudur
+        if epoch != self._epoch:
+            return
+        self._slow_start = False
+        self._epoch += 1
+        self.decreases += 1
+        self.limit = max(self.floor, self.limit / 2)
+
+    def slot(self):
+        return _SlotContext(self)
+
+    def snapshot(self):
+        return {
+            "host": self.host,
+            "limit": round(self.limit, 2),
+            "ceiling": self.ceiling,
+            "in_flight": self.in_flight,
+            "baseline_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "decreases": self.decreases,
+        }
+
+
+class _SlotContext:
+    __slots__ = ("_limit", "_token", "_slot")
+
+    def __init__(self, limit):
+        self._limit = limit
+
+    def __enter__(self):
+        self._token = self._limit.acquire()
+        self._slot = _Slot()
+        return self._slot
+
+    def __exit__(self, exc_type, exc, tb):
+        # İstisna ile çıkış yanıt alınamadı demektir
+        self._limit.release(self._token, self._slot.status, self._slot.error or exc_type is not None)
+        return False
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def configure(host, ceiling):
+    """Host için üst sınırı ayarlar (mevcut sınır dahil)."""
+    with _lock:
+        _ceilings[host] = ceiling
+        limit = _limits.get(host)
+        if limit is not None:
+            with limit._cond:
+                limit.ceiling = max(limit.floor, ceiling)
+                limit.limit = min(limit.limit, limit.ceiling)
+                limit._cond.notify_all()
+
+
+def for_host(host):
+    """Host'un paylaşılan sınırını döndürür (ilk çağrıda oluşturulur)."""
+    limit = _limits.get(host)
+    if limit is None:
+        with _lock:
+            limit = _limits.get(host)
+            if limit is None:
+                limit = _limits[host] = AIMDLimit(host, _ceilings.get(host, DEFAULT_CEILING))
+    return limit
+
+
+def for_url(url):
+    return for_host(host_of(url))
+
+
+def snapshot():
+    """Tüm host'ların güncel durumu (rapor ve hata ayıklama için)."""
+    with _lock:
+        limits = list(_limits.values())
+    return [limit.snapshot() for limit in sorted(limits, key=lambda l: l.host)]
@@ -0,0 +1,205 @@
+# http_cache.py
+# Kaynak listeler için koşullu GET (ETag / Last-Modified) doğrulayıcı önbelleği.
+#
+# Her betik kaynak URL'leri için son görülen ETag, Last-Modified ve gövde
+# özetini ".http_cache/<betik>.json" dosyasında tutar. Sonraki çalıştırmada
+# istek If-None-Match / If-Modified-Since ile gönderilir; sunucu 304 dönerse
+# ya da gövde özeti aynıysa kaynak "değişmedi" sayılır. Tüm girdiler
+# değişmediyse betik dönüşümü tamamen atlayabilir.
+#
+# Önbellek yalnızca şu koşullarda kullanılır (aksi halde koşulsuz indirilir):
+#   - betiğin kendi kaynak kodu, yüklediği depo modülleri (url_rules, extinf,
+#     m3u_lib, m3u_delta ...) ve salt_files değişmemişse (kural ya da
+#     kütüphane değişikliği eski çıktıyı geçersiz kılar),
+#   - beklenen çıktı dosyaları yerindeyse,
+#   - HTTP_CACHE_DISABLE ortam değişkeni tanımlı değilse.
+# Dosya yalnızca save() çağrılınca, yani dönüşüm başarıyla bittikten sonra
+# yazılır; yarıda kalan bir çalıştırma sonraki çalıştırmayı atlatmaz.
+#
+# keep_bodies=True ile record_text'e verilen gövdeler de özetleriyle
+# adlandırılıp sıkıştırılarak ".http_cache/<betik>.bodies/" altında tutulur;
+# 304 dönen kaynağın içeriği body() ile ikinci bir istek atılmadan okunur.
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+import http_client
+from m3u_compress import file_digest
+from m3u_lib import atomic_write, iter_response_lines
+
+CACHE_DIR = ".http_cache"
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SourceCache:
+    """Bir betiğin kaynak URL'leri için doğrulayıcı önbelleği."""
+
+    def __init__(self, name, salt_files=(), outputs=(), keep_bodies=False):
+        self.path = os.path.join(CACHE_DIR, f"{name}.json")
+        self.body_dir = os.path.join(CACHE_DIR, f"{name}.bodies") if keep_bodies else None
+        self.salt = self._salt(list(salt_files) + _repo_modules())
+        self.outputs = list(outputs)
+        self._dirty = False
+        self._results = {}
+        data = self._load()
+        self.enabled = (
+            not os.environ.get("HTTP_CACHE_DISABLE")
+            and data.get("salt") == self.salt
+            and all(os.path.exists(p) for p in self.outputs)
+        )
+        self._entries = data.get("sources", {}) if data.get("salt") == self.salt else {}
+
+    @staticmethod
+    def _salt(files):
+        h = hashlib.sha256()
+        for path in sorted(set(os.path.abspath(p) for p in files)):
+            h.update(os.path.basename(path).encode("utf-8"))
+            h.update(file_digest(path).encode("ascii") if os.path.exists(path) else b"-")
+        return h.hexdigest()[:16]
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def conditional_headers(self, url):
+        """Önbellek geçerliyse URL için If-None-Match / If-Modified-Since başlıkları."""
+        entry = self._entries.get(url) if self.enabled else None
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get(self, url, headers=None, **kwargs):
+        """Koşullu GET gönderir; yanıt 304 olabilir (bkz. not_modified)."""
+        merged = dict(headers or {})
+        merged.update(self.conditional_headers(url))
+        response = http_client.get(url, headers=merged, **kwargs)
+        if response.status_code == 304:
+            self.mark_unchanged(url)
+        return response
+
+    def not_modified(self, response):
+        return response.status_code == 304
+
+    def mark_unchanged(self, url):
+        """Başka yoldan (ör. http_fetch) gönderilen koşullu GET 304 döndüğünde."""
+        self._results[url] = True
+
+    def record(self, url, response, digest):
+        """
+        Başarılı yanıtın doğrulayıcılarını ve gövde özetini kaydeder. Gövde
+        öncekiyle aynıysa True döndürür.
+        """
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": digest,
+        }
+        old = self._entries.get(url)
+        same = bool(self.enabled and old and old.get("sha256") == digest)
+        if old != entry:
+            self._entries[url] = entry
+            self._dirty = True
+        self._results[url] = same
+        return same
+
+    def record_text(self, url, response, text):
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if self.body_dir:
+            self._store_body(digest, data)
+        return self.record(url, response, digest)
+
+    def _store_body(self, digest, data):
+        # Ad içerik özetidir; save() öncesi yazılması önceki kaydı bozmaz
+        path = os.path.join(self.body_dir, f"{digest}.gz")
+        if os.path.exists(path):
+            return
+        os.makedirs(self.body_dir, exist_ok=True)
+        with atomic_write(path, binary=True) as raw:
+            with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz:
+                gz.write(data)
+
+    def body(self, url):
+        """URL'nin son kaydedilen gövdesi (304 için); yoksa ya da bozuksa None."""
+        entry = self._entries.get(url)
+        if not self.body_dir or not entry or not entry.get("sha256"):
+            return None
+        try:
+            with gzip.open(os.path.join(self.body_dir, f"{entry['sha256']}.gz"), "rb") as f:
+                data = f.read()
+        except (OSError, EOFError):
+            return None
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            return None
+        return data.decode("utf-8")
+
+    def record_file(self, path):
+        """Yerel kaynak dosyanın özetini kaydeder; değişmediyse True döndürür."""
+        key = "file:" + path.replace(os.sep, "/")
+        digest = file_digest(path)
+        old = self._entries.get(key)
+        same = bool(self.enabled and old and old.get("sha256") == digest)
+        if not old or old.get("sha256") != digest:
+            self._entries[key] = {"sha256": digest}
+            self._dirty = True
+        self._results[key] = same
+        return same
+
+    def iter_lines(self, url, response):
+        """
+        Akan yanıtın satırlarını üretir ve özetini hesaplar; yanıt bitince
+        doğrulayıcılar kaydedilir (akış tabanlı betikler için).
+        """
+        h = hashlib.sha256()
+        for line in iter_response_lines(response):
+            h.update(line.encode("utf-8"))
+            h.update(b"\n")
+            yield line
+        self.record(url, response, h.hexdigest())
+
+    def unchanged(self):
+        """Bu çalıştırmada sorgulanan tüm kaynaklar değişmediyse True."""
+        return self.enabled and bool(self._results) and all(self._results.values())
+
+    def save(self):
+        """Önbelleği diske yazar (yalnızca değiştiyse)."""
+        if not self._dirty and os.path.exists(self.path):
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with atomic_write(self.path) as f:
+            json.dump({"salt": self.salt, "sources": self._entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write("\n")
+        self._dirty = False
+        if self.body_dir:
+            self._prune_bodies()
+
+    def _prune_bodies(self):
+        """Artık hiçbir kaynağın özetine karşılık gelmeyen gövdeleri siler."""
+        wanted = {f"{entry['sha256']}.gz" for entry in self._entries.values() if entry.get("sha256")}
+        try:
+            names = os.listdir(self.body_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".gz") and name not in wanted:
+                os.remove(os.path.join(self.body_dir, name))
+
+
+def _repo_modules():
+    """Süreçte yüklü, depo kökündeki modüllerin dosyaları (çalışan betik dahil)."""
+    files = []
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and path.endswith(".py") and os.path.dirname(os.path.abspath(path)) == REPO_DIR:
+            files.append(path)
+    return files
@@ -0,0 +1,350 @@
+# http_cassette.py
+# HTTP kayıt/oynatma (cassette) katmanı ve yerel yedek sunucu.
+#
+# Betikleri canlı sitelere gitmeden, tek makinede ve tekrarlanabilir biçimde
+# ölçmek ya da karşılaştırmak için:
+#
+#   1) Kayıt: ortak istemciden geçen her istek/yanıt çifti sıkıştırılmış bir
+#      kasete (gzip JSON satırları) yazılır.
+#        HTTP_CASSETTE_RECORD=kasetler/islemci.jsonl.gz python m3u_islemci.py
+#
+#   2) Oynatma: kaset yerel bir HTTP sunucusundan sunulur ve betiğin istekleri
+#      o sunucuya yönlendirilir. Gecikme ve bant genişliği ayarlanabilir.
+#        python http_cassette.py run kasetler/islemci.jsonl.gz --latency 0.05 \
+#            --bandwidth 2M -- python m3u_islemci.py
+#      ya da sunucuyu ayrı başlatıp:
+#        python http_cassette.py serve kaset.jsonl.gz --port 8900
+#        HTTP_CASSETTE_REPLAY=http://127.0.0.1:8900 python generate_radio.py
+#
+#   python http_cassette.py list kaset.jsonl.gz     # kasetteki istekler
+#
+# Yönlendirme http_client oturumlarında, http_fetch.fetch_many'de ve
+# M3u/Exxen.py'de yapılır: https://site/yol?x adresi
+# <sunucu>/https/site/yol?x olur. Host bazlı sınır, devre kesici ve
+# istatistikler özgün host adını kullanmaya devam eder. Kasette olmayan
+# istekler 404 ve "X-Cassette-Miss: 1" başlığıyla yanıtlanır.
+#
+# Kayıtlar (yöntem, URL, istek gövdesinin özeti) ile eşlenir; aynı URL'ye
+# farklı gövdeyle atılan POST'lar ayrı tutulur. Akış halinde okunan (stream=True)
+# yanıtlar okundukça kaydedilir; yanıt erken kapatılırsa kalan gövde de okunur.
+# Aynı istek birden fazla kez kaydedildiyse yanıtlar kayıt sırasıyla verilir,
+# sonuncusu tekrarlanır. Yanıtın ETag'i varsa If-None-Match ile 304 döner.
+# Oynatmada .http_cache atlaması istenmiyorsa HTTP_CACHE_DISABLE=1 verilir.
+
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from requests.utils import requote_uri
+
+RECORD_PATH = os.environ.get("HTTP_CASSETTE_RECORD")
+REPLAY_BASE = os.environ.get("HTTP_CASSETTE_REPLAY", "").rstrip("/")
+
+# Oynatmada saklanan yanıt başlıkları; geri kalanlar (Set-Cookie, Date...)
+# tekrarlanabilirliği bozar ya da anlamsızdır
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After", "Location")
+
+CHUNK = 16384
+
+_lock = threading.Lock()
+_writer = None
+
+
+# ---------------------------------------------------------------------------
+# Kayıt
+# ---------------------------------------------------------------------------
+
+def recording():
+    return bool(RECORD_PATH)
+
+
+def request_digest(data):
+    """İstek gövdesinin kaset anahtarındaki özeti; gövde yoksa boş metin."""
+    if not data:
+        return ""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def record(method, url, status, headers, body, elapsed=0.0, request_body=None):
+    """Bir istek/yanıt çiftini kasete ekler (yalnızca kayıt modunda)."""
+    global _writer
+    if not RECORD_PATH:
+        return
+    item = {
+        "method": method.upper(),
+        "url": requote_uri(url),
+        "request": request_digest(request_body),
+        "status": status,
+        "headers": {k: headers[k] for k in KEPT_HEADERS if headers.get(k) is not None},
+        "body": base64.b64encode(body or b"").decode("ascii"),
+        "elapsed": round(elapsed, 4),
+    }
+    line = (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+    with _lock:
+        if _writer is None:
+            directory = os.path.dirname(RECORD_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _writer = gzip.open(RECORD_PATH, "ab")
+        _writer.write(line)
+
+
+def close():
+    global _writer
+    with _lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+atexit.register(close)
+
+
+# ---------------------------------------------------------------------------
+# Oynatma
+# ---------------------------------------------------------------------------
+
+def replay_url(url):
+    """Oynatma modunda URL'yi yerel yedek sunucuya yönlendirir."""
+    if not REPLAY_BASE or url.startswith(REPLAY_BASE):
+        return url
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url
+    target = f"{REPLAY_BASE}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+    return target + (f"?{parts.query}" if parts.query else "")
+
+
+def original_url(path):
+    """Sunucuya gelen yoldan (/https/site/yol?x) özgün URL'yi çıkarır."""
+    scheme, _, rest = path.lstrip("/").partition("/")
+    # Kayıttaki anahtar gibi kodlanır: "çocuk bölüm" ile "%C3%A7ocuk%20b..." eşleşir
+    return requote_uri(f"{scheme}://{rest}")
+
+
+def load(path):
+    """Kaseti {(yöntem, url, istek özeti): [kayıt, ...]} sözlüğü olarak okur."""
+    entries = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                key = (item["method"], requote_uri(item["url"]), item.get("request", ""))
+                entries.setdefault(key, []).append(item)
+    return entries
+
+
+def parse_rate(text):
+    """"2M", "500k", "1024" biçimindeki bayt/sn değerini çevirir."""
+    if not text:
+        return None
+    units = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+    value = str(text).strip().lower()
+    # "2MB/s", "500kbps", "1024b" gibi yazımlar: sonekler sırayla atılır
+    for suffix in ("/s", "ps", "b"):
+        if value.endswith(suffix):
+            value = value[:-len(suffix)]
+    factor = units.get(value[-1:], 1)
+    if value[-1:] in units:
+        value = value[:-1]
+    try:
+        return int(float(value) * factor)
+    except ValueError:
+        raise ValueError(f"Geçersiz bant genişliği: {text!r} (ör. 2M, 500k, 1024)") from None
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Kaseti sunan yerel sunucu. latency her yanıttan önce beklenen süre
+    (saniye) ya da "recorded" (kayıttaki süre); bandwidth bağlantı başına
+    bayt/sn (None: sınırsız).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cassette, port=0, latency=0.0, bandwidth=None):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.entries = load(cassette) if isinstance(cassette, str) else cassette
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.hits = 0
+        self.misses = 0
+        self._served = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def next_item(self, method, url, digest=""):
+        key = (method, url, digest)
+        items = self.entries.get(key) or (self.entries.get(("GET", url, "")) if method == "HEAD" else None)
+        with self._lock:
+            if not items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        return items[min(index, len(items) - 1)]
+
+    def handle_error(self, request, client_address):
+        # Erken kapatılan akışlar (ör. m3u8 bulunur bulunmaz) olağandır
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._serve(send_body=True, request_body=self.rfile.read(length) if length else b"")
+
+    def _serve(self, send_body, request_body=b""):
+        server = self.server
+        item = server.next_item(self.command, original_url(self.path), request_digest(request_body))
+        if item is None:
+            self.send_response(404)
+            self.send_header("X-Cassette-Miss", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        delay = item.get("elapsed", 0.0) if server.latency == "recorded" else server.latency
+        if delay:
+            time.sleep(delay)
+
+        headers = item.get("headers", {})
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = base64.b64decode(item.get("body", ""))
+        self.send_response(item["status"])
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self._send(body)
+
+    def _send(self, body):
+        rate = self.server.bandwidth
+        if not rate:
+            self.wfile.write(body)
+            return
+        # Bant genişliği: her parçadan sonra hedef süreye kadar beklenir
+        started = time.perf_counter()
+        sent = 0
+        for i in range(0, len(body), CHUNK):
+            chunk = body[i:i + CHUNK]
+            self.wfile.write(chunk)
+            sent += len(chunk)
+            wait = sent / rate - (time.perf_counter() - started)
+            if wait > 0:
+                time.sleep(wait)
+
+
+# ---------------------------------------------------------------------------
+# Komut satırı
+# ---------------------------------------------------------------------------
+
+def _options(argv):
+    opts = {"port": 0, "latency": 0.0, "bandwidth": None}
+    rest = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("--port", "--latency", "--bandwidth") and i + 1 < len(argv):
+            value = argv[i + 1]
+            if arg == "--port":
+                opts["port"] = int(value)
+            elif arg == "--latency":
+                opts["latency"] = value if value == "recorded" else float(value)
+            else:
+                opts["bandwidth"] = parse_rate(value)
+            i += 2
+        else:
+            rest.append(arg)
+            i += 1
+    return opts, rest
+
+
+def main(argv):
+    if "--" in argv:
+        argv, command = argv[:argv.index("--")], argv[argv.index("--") + 1:]
+    else:
+        command = []
+    try:
+        opts, args = _options(argv)
+    except ValueError as e:
+        print(e)
+        return 2
+    if len(args) != 2 or args[0] not in ("serve", "run", "list"):
+        print("Kullanım: python http_cassette.py serve|list KASET [--port N] [--latency SN|recorded] [--bandwidth 2M]")
+        print("          python http_cassette.py run KASET [seçenekler] -- KOMUT ...")
+        return 2
+    action, path = args
+
+    if action == "list":
+        for (method, url, digest), items in sorted(load(path).items(), key=lambda kv: kv[0][1:]):
+            sizes = ", ".join(f"{it['status']}/{len(base64.b64decode(it['body']))}B" for it in items)
+            body = f" (gövde {digest[:10]})" if digest else ""
+            print(f"{method:4} {url}{body}  [{sizes}]")
+        return 0
+
+    server = StandInServer(path, opts["port"], opts["latency"], opts["bandwidth"]).start()
+    print(f"Yedek sunucu: {server.base_url} ({sum(len(v) for v in server.entries.values())} kayıt)", file=sys.stderr)
+    if action == "serve":
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return 0
+
+    if not command:
+        print("run için '--' sonrasında çalıştırılacak komut verilmeli.")
+        return 2
+    env = dict(os.environ, HTTP_CASSETTE_REPLAY=server.base_url)
+    env.pop("HTTP_CASSETTE_RECORD", None)
+    started = time.perf_counter()
+    code = subprocess.call(command, env=env)
+    print(f"Süre: {time.perf_counter() - started:.2f}s, kasetten {server.hits} yanıt, "
+          f"{server.misses} eksik", file=sys.stderr)
+    server.shutdown()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
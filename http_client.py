@@ -0,0 +1,263 @@
+# http_client.py
+# Tüm betiklerin ortak kullandığı, bağlantı havuzlu HTTP istemcisi.
+#
+# Çıplak requests.get her çağrıda yeni bir TCP+TLS el sıkışması yapar. Burada
+# süreç başına tek bir paylaşılan Session tutulur; aynı host'a giden istekler
+# keep-alive bağlantıları yeniden kullanır. Varsayılan zaman aşımı da tek
+# yerde tanımlanır; başlıklar requests'in varsayılanlarıdır, siteye özel
+# User-Agent/Referer gibi başlıkları her betik kendisi verir.
+#
+#   import http_client
+#   r = http_client.get(url)                      # paylaşılan oturum
+#   r = http_client.get(url, headers={"Referer": ref}, timeout=15)
+#   s = http_client.make_session(headers={...})   # siteye özel başlıklı oturum
+#
+# Aynı host'a çok sayıda eşzamanlı istek atan betikler için host bazında
+# havuz boyutu configure_host() ile büyütülebilir.
+#
+# Oturumlardan geçen her istek host_limit'in host başına uyarlanabilir
+# sınırına tabidir: iş parçacığı sayısı ne olursa olsun bir host'a aynı anda
+# giden istek sayısı gözlenen gecikme ve hata oranına göre ayarlanır.
+# Geçici hatalar http_retry kurallarıyla tekrar denenir; art arda hata veren
+# host'un devresi açılır ve istekler beklemeden HostUnavailable ile biter
+# (requests.exceptions.ConnectionError alt sınıfı, mevcut except blokları
+# yakalar). Tek bir istek için tekrar denemeyi kapatmak: get(url, retries=0).
+# Her denemenin süresi, TTFB, bağlantı süresi ve boyutu http_stats'a yazılır.
+# Kayıt/oynatma modunda (bkz. http_cassette) yanıtlar kasete yazılır ya da
+# istekler yerel yedek sunucuya yönlendirilir.
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import host_limit
+import http_cassette
+import http_retry
+import http_stats
+
+# Çıplak requests.get ile aynı başlıklar; istekler betiklerin eskiden
+# gönderdiğinden farklı görünmez (fetch_many'nin aiohttp yolu da bunları kullanır)
+DEFAULT_HEADERS = dict(requests.utils.default_headers())
+
+# (bağlantı, okuma) saniye; çağıran timeout= ile değiştirebilir
+DEFAULT_TIMEOUT = (10, 30)
+
+# Havuzda bağlantısı tutulan en fazla host sayısı ve host başına bağlantı
+POOL_HOSTS = 32
+POOL_SIZE = 16
+
+# Host bazında havuz boyutu: {"cizgivedizi.com": 32}
+HOST_POOL_SIZES = {}
+
+_lock = threading.Lock()
+_session = None
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        http_stats.note_connect(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    # connect() TLS el sıkışmasını da içerir
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        http_stats.note_connect(time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Yeni açılan bağlantıların süresini http_stats'a bildiren adaptör."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class PooledSession(requests.Session):
+    """Varsayılan zaman aşımı ve büyütülmüş bağlantı havuzu olan Session."""
+
+    def __init__(self, headers=None, pool_size=POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.default_timeout = timeout
+        self.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        adapter = TimedHTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        for host, size in HOST_POOL_SIZES.items():
+            self._mount_host(host, size)
+
+    def _mount_host(self, host, size):
+        adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=size)
+        self.mount(f"https://{host}/", adapter)
+        self.mount(f"http://{host}/", adapter)
+
+    def request(self, method, url, *args, retries=None, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.default_timeout
+        if method.upper() not in http_retry.RETRY_METHODS:
+            retries = 0
+        elif retries is None:
+            retries = http_retry.RETRIES
+        breaker = http_retry.breaker_for(url)
+        limit = host_limit.for_url(url)
+        # Sınır, devre kesici ve istatistik özgün host'a göre tutulur
+        send_url = http_cassette.replay_url(url)
+
+        attempt = 0
+        while True:
+            breaker.check()
+            # Sonuç bildirilmeden çıkılırsa (geçersiz URL, kesme, beklenmeyen
+            # hata) yarı açık devrenin deneme hakkı serbest bırakılır
+            settled = False
+            try:
+                http_stats.take_connect()
+                start = time.perf_counter()
+                try:
+                    with limit.slot() as slot:
+                        response = super().request(method, send_url, *args, **kwargs)
+                        slot.status = response.status_code
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    http_stats.record(limit.host, None, time.perf_counter() - start,
+                                      connect=http_stats.take_connect(), error=True)
+                    breaker.record(None)
+                    settled = True
+                    if attempt >= retries:
+                        raise
+                    delay = http_retry.backoff_delay(attempt)
+                else:
+                    breaker.record(response.status_code)
+                    settled = True
+                    self._record(limit.host, response, time.perf_counter() - start, kwargs.get("stream"))
+                    if http_cassette.recording():
+                        self._cassette(method, url, response, kwargs.get("stream"))
+                    if response.status_code not in http_retry.RETRY_STATUS:
+                        return response
+                    delay = http_retry.backoff_delay(attempt, http_retry.retry_after(response.headers))
+                    if attempt >= retries or delay is None:
+                        return response
+                    response.close()
+            finally:
+                if not settled:
+                    breaker.abandon()
+            time.sleep(delay)
+            attempt += 1
+
+
+    @staticmethod
+    def _cassette(method, url, response, stream):
+        body = response.request.body
+        if not isinstance(body, (bytes, str)):
+            body = None
+        elapsed = response.elapsed.total_seconds()
+        if not stream:
+            http_cassette.record(method, url, response.status_code, response.headers,
+                                 response.content, elapsed, body)
+            return
+        # Akış halindeki gövde çağıran okudukça biriktirilir; iter_lines ve
+        # content de iter_content'ten geçer. Gövde bittiğinde ya da yanıt
+        # kapatıldığında kaydedilir; okunmayan kısım kapatırken okunur.
+        chunks = []
+        state = {"source": None, "done": False}
+        read, close = response.iter_content, response.close
+
+        def finish():
+            if not state["done"]:
+                state["done"] = True
+                http_cassette.record(method, url, response.status_code, response.headers,
+                                     b"".join(chunks), elapsed, body)
+
+        def tee(chunk_size):
+            for chunk in read(chunk_size):
+                chunks.append(chunk)
+                yield chunk
+            finish()
+
+        def iter_content(chunk_size=1, decode_unicode=False):
+            state["source"] = source = tee(chunk_size)
+            if decode_unicode:
+                return requests.utils.stream_decode_response_unicode(source, response)
+            return source
+
+        def close_recorded():
+            try:
+                if not state["done"]:
+                    for _ in state["source"] or tee(http_cassette.CHUNK):
+                        pass
+            except requests.exceptions.RequestException:
+                pass
+            finally:
+                finish()
+                close()
+
+        response.iter_content = iter_content
+        response.close = close_recorded
+
+    @staticmethod
+    def _record(host, response, total, stream):
+        if stream:
+            # Gövde henüz okunmadı; boyut için başlığa güvenilir
+            length = response.headers.get("Content-Length", "")
+            nbytes = int(length) if length.isdigit() else 0
+        else:
+            nbytes = len(response.content)
+        # elapsed: istek gönderiminden yanıt başlıklarının çözülmesine kadar
+        http_stats.record(host, response.status_code, total, ttfb=response.elapsed.total_seconds(),
+                          connect=http_stats.take_connect(), nbytes=nbytes)
+
+
+def configure_host(host, pool_size):
+    """
+    Bir host için havuz boyutunu ayarlar (paylaşılan oturum dahil). Aynı
+    değer host'un uyarlanabilir eşzamanlılık sınırının tavanı olur.
+    """
+    HOST_POOL_SIZES[host] = pool_size
+    host_limit.configure(host, pool_size)
+    if _session is not None:
+        _session._mount_host(host, pool_size)
+
+
+def make_session(headers=None, pool_size=POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+    """Siteye özel başlıklarla ayrı bir havuzlu oturum oluşturur."""
+    return PooledSession(headers=headers, pool_size=pool_size, timeout=timeout)
+
+
+def session():
+    """Süreç genelinde paylaşılan oturumu döndürür (ilk çağrıda oluşturulur)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = PooledSession()
+    return _session
+
+
+def get(url, **kwargs):
+    return session().get(url, **kwargs)
+
+
+def post(url, data=None, **kwargs):
+    return session().post(url, data=data, **kwargs)
+
+
+def head(url, **kwargs):
+    return session().head(url, **kwargs)
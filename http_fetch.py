@@ -0,0 +1,284 @@
+# http_fetch.py
+# Senkron betiklerden çağrılabilen eşzamanlı toplu indirme.
+#
+#   from http_fetch import fetch_many
+#   results = fetch_many(urls, concurrency=16, per_host=4)
+#   for r in results:                  # girdiyle aynı sırada
+#       if r.ok: print(r.url, len(r.text))
+#       else:    print(r.url, r.error or r.status_code)
+#
+# aiohttp kuruluysa istekler tek bir olay döngüsünde (asyncio) gönderilir;
+# kurulu değilse ya da çağıran zaten bir olay döngüsünün içindeyse aynı
+# sınırlarla http_client oturumu üzerinden iş parçacığı havuzu kullanılır.
+# Her iki yolda da:
+#   - sonuçlar girdi sırasıyla döner,
+#   - URL başına hata yakalanır (istisna fırlatılmaz, FetchResult.error),
+#   - toplam eşzamanlılık ve host başına eşzamanlılık ayrı ayrı sınırlanır;
+#     per_host bir tavandır, host'a aynı anda giden istek sayısını
+#     host_limit'in uyarlanabilir (AIMD) sınırı belirler,
+#   - geçici hatalar tekrar denenir, ölü host'lar devre kesiciyle hızlıca
+#     elenir (bkz. http_retry).
+# Girdi öğesi bir URL ya da (url, başlıklar) çifti olabilir; böylece koşullu
+# GET başlıkları (bkz. http_cache) URL başına verilebilir.
+#
+# FetchResult, status_code/headers/text/raise_for_status ile requests
+# yanıtına benzer; http_cache.SourceCache.record() gibi yerlere doğrudan
+# verilebilir.
+
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+import host_limit
+import http_cassette
+import http_client
+import http_retry
+import http_stats
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - aiohttp isteğe bağlı
+    aiohttp = None
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST = 8
+
+# "thread" verilirse aiohttp kurulu olsa bile iş parçacığı yolu kullanılır
+BACKEND = os.environ.get("HTTP_FETCH_BACKEND", "auto")
+
+_CHARSET_RE = re.compile(r"charset=([\w.:-]+)", re.IGNORECASE)
+
+
+class FetchResult:
+    """Tek bir URL'nin sonucu. Hata durumunda error dolu, text boştur."""
+
+    __slots__ = ("url", "status_code", "headers", "content", "encoding", "error", "elapsed")
+
+    def __init__(self, url, status_code=None, headers=None, content=b"", encoding=None, error=None, elapsed=0.0):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+        self.encoding = encoding
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None and self.status_code is not None and self.status_code < 400
+
+    @property
+    def text(self):
+        encoding = self.encoding or _charset(self.headers.get("Content-Type")) or "utf-8"
+        try:
+            return self.content.decode(encoding, "replace")
+        except LookupError:
+            return self.content.decode("utf-8", "replace")
+
+    def raise_for_status(self):
+        """requests ile aynı istisna türlerini fırlatır."""
+        if self.error is not None:
+            raise requests.exceptions.RequestException(f"{self.url}: {self.error}")
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} hatası: {self.url}")
+
+    def __repr__(self):
+        state = self.error or self.status_code
+        return f"FetchResult({self.url!r}, {state!r}, {len(self.content)} bayt)"
+
+
+def _charset(content_type):
+    match = _CHARSET_RE.search(content_type or "")
+    return match.group(1) if match else None
+
+
+def _host(url):
+    return urlsplit(url).netloc.lower()
+
+
+def _normalize(items):
+    """Girdiyi [(url, başlıklar)] listesine çevirir."""
+    out = []
+    for item in items:
+        if isinstance(item, str):
+            out.append((item, None))
+        else:
+            url, headers = item
+            out.append((url, headers))
+    return out
+
+
+def _total_seconds(timeout):
+    if isinstance(timeout, tuple):
+        return sum(timeout)
+    return timeout
+
+
+# ---------------------------------------------------------------------------
+# aiohttp yolu
+# ---------------------------------------------------------------------------
+
+_TRACE_EVENTS = ("dns_resolvehost_start", "dns_resolvehost_end",
+                 "connection_create_start", "connection_create_end", "request_end")
+
+
+def _trace_config():
+    """İstek başına DNS, bağlantı ve ilk yanıt anlarını trace_request_ctx'e yazar."""
+    trace = aiohttp.TraceConfig()
+
+    def mark(name):
+        async def hook(session, ctx, params):
+            if ctx.trace_request_ctx is not None:
+                ctx.trace_request_ctx[name] = time.perf_counter()
+        return hook
+
+    for name in _TRACE_EVENTS:
+        getattr(trace, "on_" + name).append(mark(name))
+    return trace
+
+
+def _span(marks, start, end):
+    if start in marks and end in marks:
+        return marks[end] - marks[start]
+    return None
+
+
+async def fetch_many_async(urls, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                           headers=None, timeout=http_client.DEFAULT_TIMEOUT, encoding=None):
+    """fetch_many'nin olay döngüsü içinden çağrılabilen karşılığı (aiohttp gerekir)."""
+    items = _normalize(urls)
+    base_headers = dict(http_client.DEFAULT_HEADERS)
+    base_headers.update(headers or {})
+    if isinstance(timeout, tuple):
+        client_timeout = aiohttp.ClientTimeout(total=_total_seconds(timeout), sock_connect=timeout[0], sock_read=timeout[1])
+    else:
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+
+    async def attempt(session, url, extra, limit):
+        token = await limit.acquire_async()
+        start = time.perf_counter()
+        status = None
+        content = b""
+        marks = {}
+        try:
+            async with session.get(http_cassette.replay_url(url), headers=extra, trace_request_ctx=marks) as response:
+                status = response.status
+                content = await response.read()
+                http_cassette.record("GET", url, status, response.headers, content, time.perf_counter() - start)
+                return FetchResult(url, response.status, dict(response.headers), content,
+                                   encoding, None, time.perf_counter() - start)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            error = str(e) or type(e).__name__
+            return FetchResult(url, error=error, elapsed=time.perf_counter() - start)
+        finally:
+            limit.release(token, status, error=status is None)
+            ttfb = marks["request_end"] - start if "request_end" in marks else None
+            http_stats.record(limit.host, status, time.perf_counter() - start, ttfb=ttfb,
+                              connect=_span(marks, "connection_create_start", "connection_create_end"),
+                              dns=_span(marks, "dns_resolvehost_start", "dns_resolvehost_end"),
+                              nbytes=len(content), error=status is None)
+
+    async def one(session, url, extra):
+        # http_client.PooledSession.request ile aynı tekrar deneme ve devre kesici kuralları
+        limit = host_limit.for_url(url)
+        breaker = http_retry.breaker_for(url)
+        started = time.perf_counter()
+        for n in range(http_retry.RETRIES + 1):
+            if not breaker.allow():
+                return FetchResult(url, error=f"{breaker.host}: devre açık", elapsed=time.perf_counter() - started)
+            result = await attempt(session, url, extra, limit)
+            breaker.record(result.status_code)
+            if result.error is None and result.status_code not in http_retry.RETRY_STATUS:
+                break
+            delay = http_retry.backoff_delay(n, http_retry.retry_after(result.headers))
+            if delay is None or n == http_retry.RETRIES:
+                break
+            await asyncio.sleep(delay)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    async with aiohttp.ClientSession(headers=base_headers, timeout=client_timeout, connector=connector,
+                                     trace_configs=[_trace_config()]) as session:
+        # gather sonuçları görev sırasıyla döndürür
+        return await asyncio.gather(*(one(session, url, extra) for url, extra in items))
+
+
+# ---------------------------------------------------------------------------
+# İş parçacığı yolu
+# ---------------------------------------------------------------------------
+
+def _fetch_threaded(items, concurrency, per_host, headers, timeout, encoding, session):
+    sess = session or http_client.session()
+    limits = {}
+    lock = threading.Lock()
+
+    def host_slot(url):
+        host = _host(url)
+        with lock:
+            if host not in limits:
+                limits[host] = threading.Semaphore(per_host)
+            return limits[host]
+
+    # İş parçacığı yereli aşama havuz iş parçacıklarına geçmez; çağıranınki taşınır
+    stage = http_stats.current_stage()
+
+    def one(item):
+        url, extra = item
+        merged = dict(headers or {})
+        merged.update(extra or {})
+        start = time.perf_counter()
+        with host_slot(url), http_stats.stage(stage):
+            try:
+                response = sess.get(url, headers=merged, timeout=timeout)
+                return FetchResult(url, response.status_code, dict(response.headers), response.content,
+                                   encoding, None, time.perf_counter() - start)
+            except requests.exceptions.RequestException as e:
+                return FetchResult(url, error=str(e) or type(e).__name__, elapsed=time.perf_counter() - start)
+
+    # Aynı host'a giden istekler semaforda beklerken diğer host'ları
+    # tıkamasın diye havuz toplam sınır kadar açılır
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as ex:
+        return list(ex.map(one, items))
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def backend():
+    """Bu ortamda kullanılacak yol: "aiohttp" ya da "thread"."""
+    if aiohttp is None or BACKEND == "thread" or _in_event_loop():
+        return "thread"
+    return "aiohttp"
+
+
+def fetch_many(urls, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+               headers=None, timeout=http_client.DEFAULT_TIMEOUT, encoding=None, session=None):
+    """
+    URL'leri eşzamanlı indirir ve girdiyle aynı sırada FetchResult listesi
+    döndürür. headers tüm isteklere eklenir; (url, başlıklar) öğelerindeki
+    başlıklar bunların üzerine yazılır. encoding verilirse yanıtın bildirdiği
+    karakter kümesi yerine kullanılır. session yalnızca iş parçacığı yolunda
+    kullanılır (ör. siteye özel başlıklı http_client.make_session oturumu).
+    """
+    items = _normalize(urls)
+    if not items:
+        return []
+    concurrency = max(1, concurrency)
+    per_host = max(1, min(per_host, concurrency))
+    if backend() == "aiohttp":
+        if session is not None:
+            headers = {**session.headers, **(headers or {})}
+        return asyncio.run(fetch_many_async(items, concurrency, per_host, headers, timeout, encoding))
+    return _fetch_threaded(items, concurrency, per_host, headers, timeout, encoding, session)
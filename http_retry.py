@@ -0,0 +1,171 @@
+# http_retry.py
+# Geçici hatalarda tekrar deneme ve host başına devre kesici.
+#
+# Tekrar deneme: bağlantı hatası, zaman aşımı ve 429/502/503/504 yanıtları
+# geçici sayılır. Yalnızca tekrarlanabilir (GET/HEAD/OPTIONS) istekler en fazla
+# RETRIES kez yeniden gönderilir. Bekleme süresi üstel olarak büyür ve
+# tamamen rastgeledir (full jitter): aynı anda düşen istekler sunucuya aynı
+# anda geri dönmez. Sunucu Retry-After bildirirse ona uyulur; bildirilen süre
+# BACKOFF_MAX'tan uzunsa tekrar denenmez.
+#
+# Devre kesici: bir host'a arka arkaya FAILURE_THRESHOLD geçici hata alınırsa
+# devre açılır. COOLDOWN süresince o host'a istek gönderilmeden HostUnavailable
+# fırlatılır; ölü bir host her istekte tam zaman aşımı kadar bekletmez. Süre
+# dolunca devre yarı açılır ve tek bir deneme isteğine izin verilir. Deneme
+# başarılıysa devre kapanır, başarısızsa bekleme süresi ikiye katlanarak
+# (COOLDOWN_MAX'a kadar) yeniden açılır. 404 gibi yanıtlar host'un ayakta
+# olduğunu gösterir ve başarı sayılır; 429 da öyle: host yanıt veriyor,
+# yalnızca yavaşlamamızı istiyor (bunu host_limit üstlenir), devre açılmaz.
+#
+# http_client oturumları bu kuralları her isteğe uygular; aiohttp kullanan
+# kod (http_fetch, M3u/Exxen.py) breaker_for() ve backoff_delay() ile aynı
+# kuralları kendi döngüsünde uygular.
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUS = frozenset((429, 502, 503, 504))
+RETRY_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+# Devre kesici için hata sayılan durum kodları
+FAILURE_STATUS = frozenset((502, 503, 504))
+
+FAILURE_THRESHOLD = 5
+COOLDOWN = 30.0
+COOLDOWN_MAX = 300.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_lock = threading.Lock()
+_breakers = {}
+
+
+class HostUnavailable(requests.exceptions.ConnectionError):
+    """Devresi açık host'a istek gönderilmedi."""
+
+
+class CircuitBreaker:
+    """Tek bir host için devre kesici."""
+
+    def __init__(self, host, threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """İstek gönderilebilirse True; devre açıksa False."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                # Yarı açık devrede aynı anda yalnızca bir deneme isteği
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, COOLDOWN_MAX)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.threshold:
+                self._open()
+
+    def record(self, status=None):
+        """Sonucu bildirir; status None ise yanıt alınamamıştır."""
+        if status is None or status in FAILURE_STATUS:
+            self.failure()
+        else:
+            self.success()
+
+    def abandon(self):
+        """İstek host'la ilgisiz bir sebeple (ör. geçersiz URL) bittiğinde."""
+        with self._lock:
+            self._probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._probing = False
+
+    def check(self):
+        """Devre açıksa HostUnavailable fırlatır."""
+        if not self.allow():
+            raise HostUnavailable(f"{self.host}: art arda {self.failures} hata, devre açık")
+
+    def snapshot(self):
+        return {
+            "host": self.host,
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def breaker_for(url):
+    """URL'nin host'una ait paylaşılan devre kesiciyi döndürür."""
+    host = host_of(url)
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.get(host)
+            if breaker is None:
+                breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def retry_after(headers):
+    """Retry-After başlığındaki saniye değeri (yoksa ya da tarihse None)."""
+    value = (headers or {}).get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, after=None):
+    """
+    attempt. tekrardan önce beklenecek süre (0'dan başlar). Sunucunun
+    istediği süre BACKOFF_MAX'ı aşıyorsa None: tekrar denenmemeli.
+    """
+    if after is not None:
+        return after if after <= BACKOFF_MAX else None
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def snapshot():
+    with _lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in sorted(breakers, key=lambda b: b.host)]
@@ -0,0 +1,250 @@
+# http_stats.py
+# İstek zamanlamaları ve çalıştırma başına HTTP raporu.
+#
+# http_client oturumlarından ve http_fetch.fetch_many'den geçen her istek
+# için durum kodu, bayt, toplam süre, ilk bayta kadar geçen süre (TTFB) ve
+# yeni bağlantı açıldıysa bağlantı süresi kaydedilir. Kayıtlar host'a ve
+# işlem aşamasına (stage) göre toplanır; her grup için sayı, hata, durum
+# kodu dağılımı, ortalama/en büyük süre ve logaritmik süre histogramı tutulur.
+# Bellek kullanımı istek sayısından bağımsızdır.
+#
+#   import http_stats
+#   with http_stats.stage("bolumler"):     # bu iş parçacığındaki istekler
+#       ...
+#   http_stats.write_report("http_report.json")
+#   print(http_stats.histogram_markdown())
+#
+# Bağlantı süresi: requests yolunda DNS çözümleme, TCP ve TLS el sıkışması
+# birlikte "connect" olarak ölçülür (urllib3 bunları ayrı bildirmez);
+# keep-alive ile yeniden kullanılan bağlantıda 0'dır. aiohttp yolunda DNS
+# ayrıca "dns" olarak ölçülür.
+#
+# HTTP_STATS_REPORT ortam değişkeni bir dosya yolu ise süreç biterken rapor
+# oraya yazılır; böylece her betik değiştirilmeden rapor alınabilir.
+
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from m3u_lib import atomic_write
+
+# Histogram kova üst sınırları (saniye); son kova bunların üstü
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKET_LABELS = ("<50ms", "<100ms", "<250ms", "<500ms", "<1s", "<2.5s", "<5s", "<10s", "<30s", ">=30s")
+
+DEFAULT_STAGE = "genel"
+
+_lock = threading.Lock()
+_local = threading.local()
+_global_stage = DEFAULT_STAGE
+_by_host = {}
+_by_stage = {}
+
+
+class _Timing:
+    """Bir süre ölçüsünün toplamı, en büyüğü ve sayısı."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        mean = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "mean_ms": round(mean * 1000, 1), "max_ms": round(self.max * 1000, 1)}
+
+
+class Aggregate:
+    """Bir host ya da aşama için toplanmış istatistikler."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.status = {}
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.total = _Timing()
+        self.ttfb = _Timing()
+        self.connect = _Timing()
+        self.dns = _Timing()
+        self.reused = 0
+
+    def add(self, status, total, ttfb, connect, dns, nbytes, error):
+        self.requests += 1
+        if error or status is None or status >= 400:
+            self.errors += 1
+        key = str(status) if status is not None else "hata"
+        self.status[key] = self.status.get(key, 0) + 1
+        self.bytes += nbytes or 0
+        self.total.add(total)
+        self.histogram[_bucket(total)] += 1
+        if ttfb is not None:
+            self.ttfb.add(ttfb)
+        if connect:
+            self.connect.add(connect)
+        elif status is not None:
+            self.reused += 1
+        if dns is not None:
+            self.dns.add(dns)
+
+    def percentile(self, q):
+        """Histogramdan yaklaşık yüzdelik (kova üst sınırı, saniye)."""
+        if not self.requests:
+            return 0.0
+        target = q * self.requests
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.total.max
+        return self.total.max
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "status": dict(sorted(self.status.items())),
+            "total": self.total.as_dict(),
+            "ttfb": self.ttfb.as_dict(),
+            "connect": self.connect.as_dict(),
+            "dns": self.dns.as_dict() if self.dns.count else None,
+            "reused_connections": self.reused,
+            "p50_ms": round(self.percentile(0.5) * 1000),
+            "p95_ms": round(self.percentile(0.95) * 1000),
+            "histogram": dict(zip(BUCKET_LABELS, self.histogram)),
+        }
+
+
+def _bucket(seconds):
+    for i, limit in enumerate(BUCKETS):
+        if seconds < limit:
+            return i
+    return len(BUCKETS)
+
+
+def current_stage():
+    return getattr(_local, "stage", None) or _global_stage
+
+
+@contextmanager
+def stage(name):
+    """Bu iş parçacığında yapılan istekleri name aşamasına yazar."""
+    previous = getattr(_local, "stage", None)
+    _local.stage = name
+    try:
+        yield
+    finally:
+        _local.stage = previous
+
+
+def set_stage(name):
+    """Kendi aşaması olmayan tüm iş parçacıkları için varsayılan aşama."""
+    global _global_stage
+    _global_stage = name or DEFAULT_STAGE
+
+
+def record(host, status=None, total=0.0, ttfb=None, connect=None, dns=None, nbytes=0, error=False, stage_name=None):
+    """Tek bir isteğin (ya da tekrar denemesinin) ölçümünü ekler."""
+    stage_name = stage_name or current_stage()
+    with _lock:
+        for table, key in ((_by_host, host), (_by_stage, stage_name)):
+            agg = table.get(key)
+            if agg is None:
+                agg = table[key] = Aggregate()
+            agg.add(status, total, ttfb, connect, dns, nbytes, error)
+
+
+# Yeni açılan bağlantının süresi; requests yolunda istek aynı iş parçacığında
+# çalıştığından bağlantı nesnesinden isteğe iş parçacığı yereli ile aktarılır
+def note_connect(seconds):
+    _local.connect = getattr(_local, "connect", 0.0) + seconds
+
+
+def take_connect():
+    seconds = getattr(_local, "connect", 0.0)
+    _local.connect = 0.0
+    return seconds
+
+
+def reset():
+    with _lock:
+        _by_host.clear()
+        _by_stage.clear()
+
+
+def report():
+    with _lock:
+        hosts = {h: a.as_dict() for h, a in _by_host.items()}
+        stages = {s: a.as_dict() for s, a in _by_stage.items()}
+    overall = {
+        "requests": sum(h["requests"] for h in hosts.values()),
+        "errors": sum(h["errors"] for h in hosts.values()),
+        "bytes": sum(h["bytes"] for h in hosts.values()),
+    }
+    # En çok zaman harcanan host'lar önce
+    ordered = sorted(hosts.items(), key=lambda kv: kv[1]["total"]["mean_ms"] * kv[1]["requests"], reverse=True)
+    return {"overall": overall, "stages": stages, "hosts": dict(ordered)}
+
+
+def write_report(path):
+    """Raporu JSON olarak yazar."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with atomic_write(path) as f:
+        json.dump(report(), f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+def _bar(count, peak, width=30):
+    return "█" * max(1 if count else 0, round(width * count / peak)) if peak else ""
+
+
+def histogram_markdown(max_hosts=10):
+    """Aşama ve host bazında süre histogramlarını Markdown metni olarak döndürür."""
+    data = report()
+    lines = [f"Toplam {data['overall']['requests']} istek, {data['overall']['errors']} hata, "
+             f"{data['overall']['bytes'] / 1048576:.1f} MiB", ""]
+
+    def table(title, items):
+        lines.append(f"### {title}")
+        lines.append("")
+        lines.append("| | İstek | Hata | Ort. | TTFB | Bağlantı | p50 | p95 |")
+        lines.append("|---|---:|---:|---:|---:|---:|---:|---:|")
+        for name, agg in items:
+            lines.append(f"| `{name}` | {agg['requests']} | {agg['errors']} | {agg['total']['mean_ms']:.0f} ms | "
+                         f"{agg['ttfb']['mean_ms']:.0f} ms | {agg['connect']['mean_ms']:.0f} ms | "
+                         f"{agg['p50_ms']} ms | {agg['p95_ms']} ms |")
+        lines.append("")
+        for name, agg in items:
+            peak = max(agg["histogram"].values()) if agg["requests"] else 0
+            lines.append(f"`{name}`")
+            lines.append("```")
+            for label, count in agg["histogram"].items():
+                if count:
+                    lines.append(f"{label:>7} {_bar(count, peak):<30} {count}")
+            lines.append("```")
+        lines.append("")
+
+    table("Aşamalar", list(data["stages"].items()))
+    table("En yavaş host'lar", list(data["hosts"].items())[:max_hosts])
+    return "\n".join(lines)
+
+
+def _write_at_exit():
+    path = os.environ.get("HTTP_STATS_REPORT")
+    if path and _by_host:
+        write_report(path)
+
+
+atexit.register(_write_at_exit)
@@ -0,0 +1,105 @@
+# m3u8_scan.py
+# Sayfa gövdesini parça parça tarayarak m3u8 linki arama.
+#
+# Oynatıcı sayfaları büyük olabilir ama link çoğu zaman başlara yakındır.
+# StreamSearch gövdeyi indirilirken parça parça besler ve en öncelikli desen
+# eşleştiği anda durur; çağıran bağlantıyı kapatıp kalan gövdeyi hiç indirmez.
+#
+#   search = StreamSearch(EMBED_PATTERNS)
+#   for text in response.iter_content(CHUNK_SIZE, decode_unicode=True):
+#       if search.feed(text):
+#           break
+#   match = search.finish()       # (desen sırası, re.Match) ya da None
+#
+# Desenler öncelik sırasıyla verilir; sonuç, tüm gövdede re.search ile
+# sırayla denemenin (ilk desen nerede olursa olsun önce gelir) sonucuyla
+# aynıdır. Parça sınırına denk gelen eşleşmeler için önceki parçanın sonu
+# (OVERLAP karakter, ya da henüz tamamlanmamış eşleşmenin başından itibaren)
+# bir sonraki parçayla birlikte yeniden taranır. Parça sonuna OVERLAP'ten
+# yakın biten eşleşme kesin sayılmaz: açgözlü desenler sonraki veriyle
+# uzayabilir. Sonuç, eşleşme adaylarının (desenin başladığı yerden eşleştiği
+# ya da tutmadığı yere kadar) OVERLAP karakterden kısa olduğu sürece tüm
+# gövdeyle aynıdır; desenler bu yüzden boşlukta ve tırnakta biter.
+
+import codecs
+import re
+
+CHUNK_SIZE = 8192
+OVERLAP = 2048
+# Tamamlanmamış eşleşme için saklanacak en fazla karakter
+MAX_CARRY = 65536
+
+# m3u_islemci embed sayfaları: önce oynatıcının file:"..." değeri, yoksa
+# sayfadaki ilk .m3u8 adresi
+EMBED_PATTERNS = (
+    re.compile(r'file:"(https?://[^\s"]+?\.m3u8[^"\s]*)"'),
+    re.compile(r'(https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*?)'),
+)
+
+
+class StreamSearch:
+    """Öncelik sıralı desenleri parça parça gelen metinde arar."""
+
+    def __init__(self, patterns, overlap=OVERLAP):
+        self.patterns = patterns
+        self.overlap = overlap
+        self.scanned = 0
+        self._buffer = ""
+        self._best = None
+
+    @property
+    def done(self):
+        return self._best is not None and self._best[0] == 0
+
+    def feed(self, text):
+        """Yeni parçayı tarar; aramaya devam etmeye gerek kalmadıysa True."""
+        if self.done:
+            return True
+        self.scanned += len(text)
+        self._buffer += text
+        self._scan(final=False)
+        return self.done
+
+    def finish(self):
+        """Gövde bittiğinde kalan kısmı tarar ve en iyi eşleşmeyi döndürür."""
+        if not self.done:
+            self._scan(final=True)
+            self._buffer = ""
+        return self._best
+
+    def _scan(self, final):
+        buffer = self._buffer
+        limit = len(buffer) if final else len(buffer) - self.overlap
+        keep_from = max(limit, 0)
+        # Yalnızca bulunandan daha öncelikli desenler aranır
+        wanted = self._best[0] if self._best else len(self.patterns)
+        for index in range(wanted):
+            match = self.patterns[index].search(buffer)
+            if match is None:
+                continue
+            if match.end() <= limit:
+                self._best = (index, match)
+                break
+            # Sonraki parçayla tamamlanabilir; başı saklanır
+            keep_from = min(keep_from, match.start())
+        if final or self.done:
+            return
+        keep_from = max(keep_from, len(buffer) - MAX_CARRY)
+        self._buffer = buffer[keep_from:]
+
+
+def search_chunks(chunks, patterns, overlap=OVERLAP):
+    """chunks (str parçaları) içinde arar; en öncelikli eşleşmede okumayı bırakır."""
+    search = StreamSearch(patterns, overlap)
+    for text in chunks:
+        if search.feed(text):
+            break
+    return search.finish()
+
+
+def decoder(encoding):
+    """Bayt parçalarını sırayla çözmek için artımlı çözücü (bozuk bayt yer tutucuyla)."""
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
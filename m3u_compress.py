@@ -0,0 +1,123 @@
+# m3u_compress.py
+# Yazılan listelerin önceden sıkıştırılmış kopyaları ve içerik özeti.
+#
+#   liste.m3u                ->  asıl liste
+#   liste.m3u.gz             ->  gzip kopyası (her zaman)
+#   liste.m3u.zst            ->  zstd kopyası (zstandard paketi kuruluysa)
+#   liste.manifest.json      ->  her dosyanın sha256 özeti ve boyutu
+#
+# gzip başlığına zaman damgası yazılmaz; aynı liste her çalıştırmada bayt
+# bayt aynı .gz dosyasını verir, böylece statik sunucudaki (GitHub Pages,
+# raw.githubusercontent) ETag'ler de değişmez. Listenin özeti manifesttekiyle
+# aynıysa ve kopyalar yerindeyse yeniden sıkıştırma yapılmaz.
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+from m3u_lib import atomic_write
+
+try:
+    import zstandard
+except ImportError:  # zstd isteğe bağlıdır
+    zstandard = None
+
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 19
+
+_CHUNK = 1 << 20
+
+
+def manifest_path_for(path):
+    """"liste.m3u" için "liste.manifest.json" yolunu döndürür."""
+    return os.path.splitext(path)[0] + ".manifest.json"
+
+
+def artifact_paths(path):
+    """Bir listeden türetilen tüm dosyaların yolları (liste hariç)."""
+    return [path + ".gz", path + ".zst", manifest_path_for(path)]
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _describe(path):
+    return {"file": os.path.basename(path), "sha256": file_digest(path), "size": os.path.getsize(path)}
+
+
+def _load_manifest(path):
+    try:
+        with open(manifest_path_for(path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _up_to_date(path, manifest, digest):
+    if not manifest or manifest.get("sha256") != digest:
+        return False
+    for variant in manifest.get("variants", {}).values():
+        if not os.path.exists(os.path.join(os.path.dirname(path), variant["file"])):
+            return False
+    # zstd sonradan kurulduysa eksik kopya üretilmelidir
+    return "gzip" in manifest.get("variants", {}) and (zstandard is None or "zstd" in manifest["variants"])
+
+
+def _write_gzip(path):
+    with open(path, "rb") as src, atomic_write(path + ".gz", binary=True) as raw:
+        # filename ve mtime boş bırakılır: çıktı yalnızca içeriğe bağlıdır
+        with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=GZIP_LEVEL, mtime=0) as gz:
+            shutil.copyfileobj(src, gz, _CHUNK)
+
+
+def _write_zstd(path):
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    with open(path, "rb") as src, atomic_write(path + ".zst", binary=True) as raw:
+        compressor.copy_stream(src, raw)
+
+
+def publish(path, zstd=True):
+    """
+    Listenin sıkıştırılmış kopyalarını ve manifestini günceller. İçerik
+    değişmediyse hiçbir dosyaya dokunulmaz. (manifest, yeniden_üretildi_mi)
+    döndürür.
+    """
+    digest = file_digest(path)
+    manifest = _load_manifest(path)
+    if _up_to_date(path, manifest, digest):
+        return manifest, False
+
+    _write_gzip(path)
+    variants = {"gzip": _describe(path + ".gz")}
+    if zstd and zstandard is not None:
+        _write_zstd(path)
+        variants["zstd"] = _describe(path + ".zst")
+    elif os.path.exists(path + ".zst"):
+        # Eski içerikten kalan zstd kopyası yanlış liste sunmasın
+        os.remove(path + ".zst")
+
+    manifest = {
+        "file": os.path.basename(path),
+        "sha256": digest,
+        "size": os.path.getsize(path),
+        "etag": f'"{digest[:32]}"',
+        "variants": variants,
+    }
+    with atomic_write(manifest_path_for(path)) as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    return manifest, True
+
+
+def remove_artifacts(path):
+    """Silinen bir listenin sıkıştırılmış kopyalarını ve manifestini kaldırır."""
+    for artifact in artifact_paths(path):
+        if os.path.exists(artifact):
+            os.remove(artifact)
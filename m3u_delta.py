@@ -0,0 +1,163 @@
+# m3u_delta.py
+# Giriş bazında artımlı yeniden üretim.
+# Önceki çalıştırmada yazılmış liste okunur ve girişler (URL + başlık)
+# anahtarıyla eşleştirilir. Yeni liste yazılırken eklenen/silinen/değişen
+# girişler hesaplanır; hiçbir fark yoksa dosyaya dokunulmaz (commit de oluşmaz).
+# Fark varsa liste atomik olarak değiştirilir ve yanına küçük bir
+# "<ad>.delta.json" dosyası yazılır. Liste ayrıca m3u_compress ile .gz (ve
+# varsa .zst) olarak yayımlanır.
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from m3u_compress import publish
+from m3u_lib import HEADER, M3UReader, M3UWriter, atomic_write
+
+
+def entry_key(entry):
+    """Bir girişin listeler arası kimliği: URL + başlık."""
+    return f"{entry.url.strip()}\t{entry.title}"
+
+
+def _digest(entry):
+    h = hashlib.blake2b(digest_size=8)
+    for line in entry.lines():
+        h.update(line.encode("utf-8"))
+        h.update(b"\n")
+    return h.digest()
+
+
+def delta_path_for(path):
+    """"liste.m3u" için "liste.delta.json" yolunu döndürür."""
+    return os.path.splitext(path)[0] + ".delta.json"
+
+
+class Snapshot:
+    """Bir listenin giriş anahtarları, içerik özetleri ve sıra özeti."""
+
+    def __init__(self, header=None):
+        self.header = header
+        self.digests = {}
+        self.count = 0
+        self._order = hashlib.blake2b(digest_size=16)
+
+    def add(self, key, digest):
+        self.digests[key] = digest
+        self.count += 1
+        self._order.update(key.encode("utf-8"))
+        self._order.update(b"\0")
+
+    @property
+    def order(self):
+        return self._order.digest()
+
+
+def load_snapshot(path):
+    """Diskteki listeden Snapshot üretir; dosya yoksa None döndürür."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        reader = M3UReader(f)
+        snapshot = Snapshot()
+        for entry in reader:
+            snapshot.add(entry_key(entry), _digest(entry))
+        snapshot.header = reader.header
+    return snapshot
+
+
+def _entry_json(entry):
+    return {"title": entry.title, "extinf": entry.extinf, "options": entry.options, "url": entry.url}
+
+
+class DeltaWriter(M3UWriter):
+    """
+    M3UWriter gibi çalışır; ek olarak her girişi önceki listeyle karşılaştırır.
+    Sadece eklenen ve değişen girişler bellekte tutulur.
+    """
+
+    def __init__(self, f, previous, header=HEADER):
+        super().__init__(f, header)
+        self.previous = previous
+        self.current = Snapshot(header)
+        self.added = []
+        self.changed = []
+
+    def write(self, entry):
+        super().write(entry)
+        key = entry_key(entry)
+        digest = _digest(entry)
+        self.current.add(key, digest)
+        if self.previous is None:
+            return
+        old = self.previous.digests.get(key)
+        if old is None:
+            self.added.append(_entry_json(entry))
+        elif old != digest:
+            self.changed.append(_entry_json(entry))
+
+    def removed(self):
+        if self.previous is None:
+            return []
+        return [key for key in self.previous.digests if key not in self.current.digests]
+
+    def has_changes(self):
+        prev = self.previous
+        if prev is None:
+            return True
+        return bool(
+            self.added or self.changed
+            or prev.count != self.current.count
+            or prev.order != self.current.order
+            or (prev.header or HEADER) != (self.current.header or HEADER)
+        )
+
+    def delta(self, path):
+        prev = self.previous
+        removed = self.removed()
+        return {
+            "file": os.path.basename(path),
+            "generated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            # Önceki liste yoksa fark yerine tam dosya indirilmelidir
+            "full": prev is None,
+            "previous_count": prev.count if prev else 0,
+            "count": self.current.count,
+            "reordered": bool(prev) and not (self.added or removed) and prev.order != self.current.order,
+            "added": self.added,
+            "removed": [{"url": k.split("\t", 1)[0], "title": k.split("\t", 1)[1]} for k in removed],
+            "changed": self.changed,
+        }
+
+    def summary(self):
+        if self.previous is None:
+            return f"{self.count} giriş (ilk oluşturma)"
+        return f"+{len(self.added)} -{len(self.removed())} ~{len(self.changed)} ({self.count} giriş)"
+
+
+@contextmanager
+def write_playlist(path, header=HEADER, delta_file=True, compress=True):
+    """
+    Listeyi DeltaWriter ile geçici dosyaya yazar. Önceki listeye göre fark
+    yoksa geçici dosya atılır ve hedef dosyaya dokunulmaz; fark varsa dosya
+    atomik olarak değiştirilir ve (istenirse) .delta.json yazılır.
+    compress=True ise .gz/.zst kopyaları ve manifest yalnızca içerik
+    özeti değiştiğinde yeniden üretilir.
+    Çağıran, blok bittikten sonra writer.has_changes() ile sonucu görebilir.
+    """
+    previous = load_snapshot(path)
+    writer = None
+
+    def keep():
+        return writer.has_changes()
+
+    with atomic_write(path, keep=keep) as f:
+        writer = DeltaWriter(f, previous, header)
+        yield writer
+
+    if delta_file and writer.has_changes():
+        with open(delta_path_for(path), "w", encoding="utf-8") as f:
+            json.dump(writer.delta(path), f, ensure_ascii=False, indent=1)
+    if compress:
+        publish(path)
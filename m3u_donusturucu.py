@@ -1,7 +1,10 @@
 # Gerekli kütüphaneleri içe aktarıyoruz
 import requests
-import urllib.parse
-import re
+
+from http_cache import SourceCache
+from m3u_delta import write_playlist
+from m3u_lib import read_header
+from url_rules import compile_rules
 
 # --- AYARLAR ---
 
@@ -21,92 +24,61 @@ USER_AGENT = "Mozilla/5.0 (Linux; Android 14; 23117RA68G Build/UP1A.231005.007)
 NEW_GROUP_TITLE = "Filmler"
 
 
-def process_url_and_get_headers(line):
+# Proxy linkini çözüp '/video/<id>' yolunu '/manifests/<id>/master.txt' olarak
+# yeniden yazan ve gerekli başlıkları ekleyen kural. Proxy adresi URL'nin
+# herhangi bir yerinde geçebilir; format uymazsa satır olduğu gibi bırakılır.
+RULES = compile_rules([
+    {
+        "contains": "zeroipday-zeroipday.hf.space/proxy/setfilmizle/fastplay?url=",
+        "extract": "url",
+        "rewrite": (r"^(?P<base>.*)/video/(?P<id>.*)$", "{base}/manifests/{id}/master.txt"),
+        "headers": {"http-referrer": REFERER, "http-user-agent": USER_AGENT},
+    },
+])
+
+
+def process_entry(entry):
     """
-    Verilen URL satırını dönüştürür ve başlıklarla birlikte tam bir blok olarak döndürür.
+    Grup başlığını değiştirir, URL'yi dönüştürür ve başlıkları ekler.
     """
-    # URL'nin proxy yapısına uyup uymadığını kontrol et
-    if "zeroipday-zeroipday.hf.space/proxy/setfilmizle/fastplay?url=" in line:
-        try:
-            # URL'yi parçalara ayır ve 'url' parametresini al
-            parsed_url = urllib.parse.urlparse(line)
-            query_params = urllib.parse.parse_qs(parsed_url.query)
-            
-            if 'url' not in query_params or not query_params['url']:
-                return line # Dönüşüm yapılamıyorsa orijinal satırı döndür
-            
-            original_video_url = query_params['url'][0]
+    if entry.extinf:
+        # Var olan group-title özelliklerini değiştir; olmayan satıra eklenmez
+        entry.replace_attr("group-title", NEW_GROUP_TITLE)
 
-            # URL'de '/video/' kısmı var mı diye kontrol et
-            if '/video/' in original_video_url:
-                parts = original_video_url.rsplit('/video/', 1)
-                
-                if len(parts) == 2:
-                    base_url = parts[0]
-                    video_id = parts[1]
-                    
-                    # Yeni URL'yi dinamik video kimliği ile oluştur
-                    new_url = f"{base_url}/manifests/{video_id}/master.txt"
-                    
-                    # Gerekli başlıkları oluştur
-                    ext_referrer = f"#EXTVLCOPT:http-referrer={REFERER}"
-                    ext_user_agent = f"#EXTVLCOPT:http-user-agent={USER_AGENT}"
-                    
-                    # Başlıkları ve yeni URL'yi birleştirerek tam bir blok oluştur
-                    return f"{ext_referrer}\n{ext_user_agent}\n{new_url}"
-            
-            # Eğer format uygun değilse, dönüşüm yapma
-            return line
-
-        except Exception as e:
-            print(f"URL dönüştürülürken hata oluştu: {line} -> Hata: {e}")
-            return line
-    
-    # Eğer proxy URL'si değilse, satırı olduğu gibi geri döndür
-    return line
+    # URL'yi dönüştür ve başlıkları ekle
+    RULES.apply_entry(entry)
+    return entry
 
 def process_m3u():
     """
-    Ana M3U işleme fonksiyonu.
+    Ana M3U işleme fonksiyonu. Liste akış halinde indirilir, girişler
+    geldikçe dönüştürülüp geçici dosyaya yazılır ve sonunda atomik olarak
+    çıktı dosyasının yerine taşınır.
     """
     print(f"Kaynak M3U listesi indiriliyor: {SOURCE_URL}")
     
     try:
-        response = requests.get(SOURCE_URL, timeout=15)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"M3U listesi indirilemedi: {e}")
-        return
-
-    lines = response.text.splitlines()
-    new_m3u_content = []
+        # Önceki ETag/Last-Modified gönderilir; kaynak değişmediyse iş atlanır
+        cache = SourceCache("m3u_donusturucu", salt_files=[__file__], outputs=[OUTPUT_FILE])
+        with cache.get(SOURCE_URL, timeout=15, stream=True) as response:
+            if cache.not_modified(response):
+                print("Kaynak değişmedi (304), dönüştürme atlandı.")
+                return
+            response.raise_for_status()
 
-    for line in lines:
-        # #EXTINF satırını işle
-        if line.strip().startswith("#EXTINF"):
-            # Regex kullanarak group-title="... " kısmını yenisiyle değiştir
-            modified_line = re.sub(
-                r'group-title="[^"]*"', 
-                f'group-title="{NEW_GROUP_TITLE}"', 
-                line
-            )
-            new_m3u_content.append(modified_line)
-        
-        # URL satırını işle
-        elif line.strip() and not line.strip().startswith("#"):
-            # URL'yi dönüştür ve başlıkları ekle
-            converted_block = process_url_and_get_headers(line.strip())
-            new_m3u_content.append(converted_block)
-        
-        # Diğer satırları (#EXTM3U gibi) olduğu gibi ekle
+            # Girişleri indirme sürerken dönüştürüp dosyaya yaz
+            # Kaynağın başlık satırı (x-tvg-url vb.) korunur
+            header, entries = read_header(cache.iter_lines(SOURCE_URL, response))
+            with write_playlist(OUTPUT_FILE, header=header) as writer:
+                for entry in entries:
+                    writer.write(process_entry(entry))
+        cache.save()
+        if writer.has_changes():
+            print(f"Dönüştürme tamamlandı. Liste '{OUTPUT_FILE}' dosyasına kaydedildi. ({writer.summary()})")
         else:
-            new_m3u_content.append(line)
-            
-    try:
-        # Yeni içeriği dosyaya yaz
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            f.write("\n".join(new_m3u_content))
-        print(f"Dönüştürme tamamlandı. Liste '{OUTPUT_FILE}' dosyasına kaydedildi.")
+            print(f"'{OUTPUT_FILE}' güncel, değişiklik yok.")
+    except requests.exceptions.RequestException as e:
+        print(f"M3U listesi indirilemedi: {e}")
     except IOError as e:
         print(f"Dosya yazılırken bir hata oluştu: {e}")
 
@@ -0,0 +1,202 @@
+# m3u_index.py
+# Büyük M3U dosyaları için mmap tabanlı giriş ofset indeksi.
+# Dosya bir kez taranır; her girişin başlangıç (#EXTINF) ve bitiş (URL satırı
+# sonu) ofsetleri ile grup bilgisi yanındaki ".idx" dosyasına yazılır.
+# Sonraki okumalarda dosyanın tamamını çözmeden N. girişe veya bir gruba
+# doğrudan atlanabilir. İndeks yerel bir önbellektir, depoya işlenmez
+# (.gitignore: *.idx); yoksa ya da geçersizse yeniden oluşturulur.
+#
+# Kullanım:
+#   python m3u_index.py merged_playlist.m3u movies.m3u
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from m3u_lib import iter_entries
+
+INDEX_SUFFIX = ".idx"
+
+_MAGIC = b"M3UIDX2\0"
+# kaynak boyutu, kaynak mtime (ns), baş/son blok crc32, giriş sayısı, grup tablosu uzunluğu
+_HEADER = struct.Struct("<QQIII")
+# Doğrulamada özeti alınan baş ve son blok boyutu
+_PROBE = 65536
+_GROUP_KEY = b'group-title="'
+
+
+def _fingerprint(path):
+    """
+    Dosyanın (boyut, mtime, baş ve son blok crc32) değerini döndürür. Dosyanın
+    tamamı okunmaz; indeksi doğrulamak sabit maliyetlidir. Dosya yeniden
+    yazılınca mtime değişir ve indeks yeniden oluşturulur.
+    """
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        crc = zlib.crc32(f.read(_PROBE))
+        if st.st_size > _PROBE:
+            f.seek(max(_PROBE, st.st_size - _PROBE))
+            crc = zlib.crc32(f.read(_PROBE), crc)
+    return st.st_size, st.st_mtime_ns, crc
+
+
+def index_path_for(path):
+    """Bir çalma listesinin indeks dosyasının yolunu döndürür."""
+    return path + INDEX_SUFFIX
+
+
+def scan_offsets(buf):
+    """
+    Bayt tamponunu (mmap veya bytes) tarar ve her giriş için
+    (başlangıç, bitiş, grup adı) üçlüsünü sırayla üretir.
+    """
+    size = len(buf)
+    pos = 0
+    start = -1
+    group = ""
+    while pos < size:
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            nl = size
+        # Satır başındaki boşlukları atla
+        line_start = pos
+        while line_start < nl and buf[line_start:line_start + 1] in (b" ", b"\t", b"\r"):
+            line_start += 1
+        first = buf[line_start:line_start + 1]
+        if buf[line_start:line_start + 7] == b"#EXTINF":
+            start = line_start
+            g = buf.find(_GROUP_KEY, line_start, nl)
+            if g >= 0:
+                g += len(_GROUP_KEY)
+                g_end = buf.find(b'"', g, nl)
+                group = bytes(buf[g:g_end]).decode("utf-8", "replace") if g_end >= 0 else ""
+            else:
+                group = ""
+        elif first and first != b"#" and start >= 0 and line_start < nl:
+            end = nl if nl == size else nl + 1
+            yield start, end, group
+            start = -1
+        pos = nl + 1
+
+
+class M3UIndex:
+    """Bir M3U dosyası ve ona ait ofset indeksi."""
+
+    def __init__(self, path, starts, ends, group_ids, groups):
+        self.path = path
+        self._starts = starts
+        self._ends = ends
+        self._group_ids = group_ids
+        self._groups = groups
+
+    def __len__(self):
+        return len(self._starts)
+
+    @classmethod
+    def build(cls, path):
+        """Dosyayı mmap ile tarayıp indeksi oluşturur ve yan dosyaya kaydeder."""
+        starts, ends, group_ids = array("Q"), array("Q"), array("I")
+        groups, group_map = [], {}
+        if os.path.getsize(path) > 0:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, end, group in scan_offsets(mm):
+                    gid = group_map.get(group)
+                    if gid is None:
+                        gid = group_map[group] = len(groups)
+                        groups.append(group)
+                    starts.append(start)
+                    ends.append(end)
+                    group_ids.append(gid)
+        index = cls(path, starts, ends, group_ids, groups)
+        index.save()
+        return index
+
+    def save(self):
+        size, mtime, crc = _fingerprint(self.path)
+        group_blob = json.dumps(self._groups, ensure_ascii=False).encode("utf-8")
+        tmp = index_path_for(self.path) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER.pack(size, mtime, crc, len(self._starts), len(group_blob)))
+            f.write(group_blob)
+            self._starts.tofile(f)
+            self._ends.tofile(f)
+            self._group_ids.tofile(f)
+        os.replace(tmp, index_path_for(self.path))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Yan dosyadaki indeksi yükler. İndeks yoksa, bozuksa veya kaynak dosya
+        değişmişse None döndürür.
+        """
+        idx_path = index_path_for(path)
+        try:
+            with open(idx_path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    return None
+                size, mtime, crc, count, group_len = _HEADER.unpack(f.read(_HEADER.size))
+                if (size, mtime, crc) != _fingerprint(path):
+                    return None
+                groups = json.loads(f.read(group_len).decode("utf-8"))
+                starts, ends, group_ids = array("Q"), array("Q"), array("I")
+                starts.fromfile(f, count)
+                ends.fromfile(f, count)
+                group_ids.fromfile(f, count)
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+        return cls(path, starts, ends, group_ids, groups)
+
+    @classmethod
+    def load_or_build(cls, path):
+        """Geçerli bir indeks varsa onu, yoksa yeni oluşturulanı döndürür."""
+        return cls.load(path) or cls.build(path)
+
+    def groups(self):
+        """Dosyadaki grup adlarını ilk görülme sırasıyla döndürür."""
+        return list(self._groups)
+
+    def _read(self, mm, i):
+        raw = mm[self._starts[i]:self._ends[i]].decode("utf-8", "replace")
+        return next(iter_entries(raw.splitlines()))
+
+    def _iter(self, positions):
+        if not len(self):
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for i in positions:
+                yield self._read(mm, i)
+
+    def entry(self, n):
+        """N. girişi (0 tabanlı) dosyanın geri kalanını okumadan döndürür."""
+        if not -len(self) <= n < len(self):
+            raise IndexError(n)
+        return next(self._iter([n % len(self)]))
+
+    def entries(self, start=0, stop=None):
+        """[start, stop) aralığındaki girişleri sırayla üretir."""
+        return self._iter(range(*slice(start, stop).indices(len(self))))
+
+    def group(self, name):
+        """Belirtilen group-title değerine sahip girişleri sırayla üretir."""
+        try:
+            gid = self._groups.index(name)
+        except ValueError:
+            return iter(())
+        return self._iter(i for i, g in enumerate(self._group_ids) if g == gid)
+
+    def __iter__(self):
+        return self.entries()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python m3u_index.py <dosya.m3u> [...]")
+        sys.exit(1)
+    for playlist in sys.argv[1:]:
+        idx = M3UIndex.build(playlist)
+        print(f"{playlist}: {len(idx)} giriş, {len(idx.groups())} grup -> {index_path_for(playlist)}")
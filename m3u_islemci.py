@@ -1,91 +1,238 @@
 # Gerekli kütüphaneleri içe aktarıyoruz.
 import requests
-import re
-from urllib.parse import unquote
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from urllib.parse import unquote, urlsplit
 
-def find_m3u8_link(url):
+import http_client
+from embed_cache import EmbedCache
+from http_cache import SourceCache
+from m3u_delta import write_playlist
+from m3u_lib import read_header
+from m3u8_scan import CHUNK_SIZE, EMBED_PATTERNS, search_chunks
+
+# Aynı anda çözülen embed sayısı ve bunlardan aynı host'a gidebilecek en fazlası
+MAX_WORKERS = 16
+PER_HOST = 4
+# Önbellekte eski (stale) linki olan embed için yeni çözümün beklendiği en uzun süre (sn)
+STALE_DEADLINE = 8
+
+def fetch_embed_page(url, retries=None):
     """
-    Verilen 'embed' URL'sinin kaynak kodundan asıl .m3u8 linkini bulur.
+    Embed sayfasını parça parça okuyup asıl .m3u8 linkini döndürür (yoksa
+    None). Oynatıcının file:"..." linki bulunur bulunmaz indirme kesilir,
+    sayfanın geri kalanı hiç indirilmez. Ağ hatasında RequestException fırlatır.
     """
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': url
-        }
-        response = requests.get(url, headers=headers, timeout=15)
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Referer': url
+    }
+    with http_client.get(url, headers=headers, timeout=15, stream=True, retries=retries) as response:
         response.raise_for_status()
-        html_content = response.text
-        
-        match = re.search(r'file:"(https?://[^\s"]+?\.m3u8[^"]*)"', html_content)
-        if match:
-            return unquote(match.group(1))
-        
-        generic_match = re.search(r'(https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*?)', html_content)
-        if generic_match:
-            return unquote(generic_match.group(0))
-            
-        return None
+        if not response.encoding:
+            response.encoding = "utf-8"
+        return extract_m3u8(response.iter_content(CHUNK_SIZE, decode_unicode=True))
 
+def extract_m3u8(chunks):
+    """
+    Sayfa kaynağındaki asıl .m3u8 linkini döndürür (yoksa None). chunks
+    metin parçalarıdır; önce file:"..." değeri, yoksa ilk .m3u8 adresi alınır.
+    """
+    found = search_chunks(chunks, EMBED_PATTERNS)
+    return unquote(found[1].group(1)) if found else None
+
+def find_m3u8_link(url, embeds=None, retries=None):
+    """
+    Verilen 'embed' URL'sinin kaynak kodundan asıl .m3u8 linkini bulur.
+    embeds (EmbedCache) verilirse sonuç kaydedilir: link bulunamayan sayfa
+    olumsuz kayıt olarak tutulur, ağ hataları kaydedilmez.
+    """
+    try:
+        stream_link = fetch_embed_page(url, retries)
     except requests.exceptions.RequestException as e:
         print(f"  [HATA] {url} adresine erişilemedi: {e}")
         return None
+    if embeds is not None:
+        if stream_link:
+            embeds.put(url, stream_link)
+        else:
+            embeds.fail(url)
+    return stream_link
+
+def needs_resolving(entry):
+    return bool(entry.extinf and entry.url.startswith("http"))
 
-def process_m3u_playlist(playlist_url):
+def process_entry(entry, stream_link):
     """
-    Bir M3U playlist URL'si alır, içindeki linkleri işler ve yeni bir playlist içeriği döndürür.
+    Girişin embed linkini çözülen asıl .m3u8 linkiyle değiştirir.
+    Link bulunamadıysa orijinal link korunur.
+    """
+    if needs_resolving(entry):
+        print(f"\nİşleniyor: {entry.title}")
+        print(f"  -> Orijinal link: {entry.url}")
+        if stream_link:
+            print(f"  => Bulunan link: {stream_link}")
+            entry.url = stream_link
+        else:
+            print("  !! Asıl link bulunamadı, orijinal link korunuyor.")
+    return entry
+
+class _SlotClock:
+    """Embed isteği host sırasını aldığında başlayan süre ölçer."""
+
+    def __init__(self):
+        self.started_at = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._ready.set()
+
+    def stop(self, _future=None):
+        # İstek hiç başlamadan bittiyse bekleyen uyandırılır
+        self._ready.set()
+
+    def remaining(self, seconds):
+        """Sıra alınana kadar bekler; başlangıçtan bu yana kalan süreyi döndürür."""
+        self._ready.wait()
+        if self.started_at is None:
+            return None
+        return max(0.0, self.started_at + seconds - time.monotonic())
+
+def resolve_entries(entries, workers=MAX_WORKERS, per_host=PER_HOST, embeds=None,
+                    stale_deadline=STALE_DEADLINE):
+    """
+    Embed linklerini eşzamanlı çözer ve (giriş, bulunan link) çiftlerini
+    listedeki özgün sırayla üretir. Önde en fazla workers * 4 giriş bekletilir;
+    bellek liste boyutuyla değil bu pencereyle sınırlıdır. Toplam süre
+    gecikmelerin toplamı yerine yaklaşık gecikme * giriş / workers olur.
+    embeds verilirse süresi dolmamış eşlemeler istek atılmadan kullanılır.
+    Yeni çözüm başarısız olursa ya da eski linki olan embed, host sırasını
+    aldıktan sonra stale_deadline saniyede çözülemezse önbellekteki son
+    çalışan link üretilir; geç biten
+    çözüm arka planda sürer ve sonucu sonraki çalıştırma için önbelleğe yazılır.
+    """
+    host_slots = {}
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def resolve(url, clock=None):
+        host = urlsplit(url).netloc.lower()
+        with lock:
+            slot = host_slots.get(host)
+            if slot is None:
+                slot = host_slots[host] = threading.Semaphore(per_host)
+        with slot:
+            if clock is None:
+                return find_m3u8_link(url, embeds)
+            if finished.is_set():
+                # Çıktı eski linkle yazıldı; sıradaki yenilemeler sonraki çalıştırmaya kalır
+                return None
+            # Bekleme süresi host sırası alındığında başlar
+            clock.start()
+            # Eski linki olan embed tekrar denenmez; başarısızlıkta eski link yeterli
+            return find_m3u8_link(url, embeds, 0)
+
+    def submit(ex, entry):
+        # (future, önbellekten gelen link, eski link varsa süre ölçer)
+        if not needs_resolving(entry):
+            return None, None, None
+        clock = None
+        if embeds is not None:
+            cached, stream_link = embeds.lookup(entry.url)
+            if cached:
+                return None, stream_link, None
+            if embeds.stale(entry.url):
+                clock = _SlotClock()
+        future = ex.submit(resolve, entry.url, clock)
+        if clock is not None:
+            future.add_done_callback(clock.stop)
+        return future, None, clock
+
+    def result(entry, future, stream_link, clock):
+        if future is not None:
+            timeout = None if clock is None else clock.remaining(stale_deadline)
+            try:
+                stream_link = future.result(timeout)
+            except FutureTimeout:
+                print(f"  [ZAMAN AŞIMI] {entry.url} {stale_deadline}s içinde çözülemedi, eski link kullanılıyor.")
+        if not stream_link and embeds is not None and needs_resolving(entry):
+            stream_link = embeds.use_stale(entry.url)
+        return stream_link
+
+    window = deque()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for entry in entries:
+            window.append((entry,) + submit(ex, entry))
+            if len(window) >= workers * 4:
+                item = window.popleft()
+                yield item[0], result(*item)
+        while window:
+            item = window.popleft()
+            yield item[0], result(*item)
+        # Yalnızca zamanında bitmeyen yenilemeler kaldı; sürmekte olanlar beklenir
+        finished.set()
+
+def process_m3u_playlist(playlist_url, output_filename):
+    """
+    Bir M3U playlist URL'si alır, listeyi akış halinde okuyup içindeki
+    linkleri işler ve girişleri geldikçe çıktı dosyasına yazar. Yazılan giriş
+    sayısını döndürür. Kaynak liste önceki çalıştırmadan beri değişmediyse
+    (304) embed çözümleme yapılmaz ve 0 döner; içerik aynı olduğunda ise
+    eşlemeler embed önbelleğinden gelir ve çıktıya dokunulmaz.
     """
     print(f"Playlist indiriliyor: {playlist_url}")
+    cache = SourceCache("m3u_islemci", salt_files=[__file__], outputs=[output_filename])
+    embeds = EmbedCache()
+    # Süresi dolan eşleme varsa liste değişmemiş (304) olsa da o embed'ler yenilenir
+    refresh = embeds.has_expired()
+    embed_urls = set()
+
+    def entries(lines):
+        for entry in lines:
+            # process_entry girişin linkini değiştirdiğinden embed önceden kaydedilir
+            if needs_resolving(entry):
+                embed_urls.add(entry.url)
+            yield entry
+
     try:
-        response = requests.get(playlist_url)
-        response.raise_for_status()
-        playlist_content = response.text
+        # Liste akış halinde okunur; girişler indirme sürerken çözülüp yazılır
+        if refresh:
+            response = http_client.get(playlist_url, timeout=30, stream=True)
+        else:
+            response = cache.get(playlist_url, timeout=30, stream=True)
+        with response:
+            if cache.not_modified(response):
+                print("Kaynak liste değişmedi (304), link çözümleme atlandı.")
+                return 0
+            response.raise_for_status()
+            header, source_entries = read_header(cache.iter_lines(playlist_url, response))
+            with write_playlist(output_filename, header=header) as writer:
+                for entry, stream_link in resolve_entries(entries(source_entries), embeds=embeds):
+                    writer.write(process_entry(entry, stream_link))
     except requests.exceptions.RequestException as e:
         print(f"Ana playlist indirilemedi: {e}")
         return None
 
-    lines = playlist_content.splitlines()
-    new_playlist_lines = []
-    
-    for i in range(len(lines)):
-        line = lines[i].strip()
-        
-        if line.startswith("#EXTINF:"):
-            new_playlist_lines.append(line)
-            
-            if i + 1 < len(lines):
-                embed_url = lines[i + 1].strip()
-                
-                if embed_url.startswith("http"):
-                    title = line.split(',')[-1]
-                    print(f"\nİşleniyor: {title}")
-                    print(f"  -> Orijinal link: {embed_url}")
-                    
-                    stream_link = find_m3u8_link(embed_url)
-                    
-                    if stream_link:
-                        print(f"  => Bulunan link: {stream_link}")
-                        new_playlist_lines.append(stream_link)
-                    else:
-                        print("  !! Asıl link bulunamadı, orijinal link korunuyor.")
-                        new_playlist_lines.append(embed_url)
-                else:
-                    new_playlist_lines.append(lines[i+1])
-        
-        elif not (i > 0 and lines[i-1].startswith("#EXTINF:")):
-             new_playlist_lines.append(line)
-
-    return "\n".join(new_playlist_lines)
+    # Listeden çıkan embed'lerin kayıtları tutulmaz
+    embeds.retain(embed_urls)
+    embeds.save()
+    cache.save()
+    print(f"\nEmbed önbelleği: {embeds.summary()}")
+
+    print(f"\nDeğişiklikler: {writer.summary()}" if writer.has_changes() else "\nListede değişiklik yok.")
+    return writer.count
 
 if __name__ == "__main__":
     INPUT_PLAYLIST_URL = "https://raw.githubusercontent.com/zerodayip/m3u8file/main/dizigomfilmler.m3u"
     OUTPUT_FILENAME = "dizigom_cozulmus.m3u"
 
     print("İşlem başlıyor...")
-    processed_content = process_m3u_playlist(INPUT_PLAYLIST_URL)
-
-    if processed_content:
-        with open(OUTPUT_FILENAME, "w", encoding="utf-8") as f:
-            f.write(processed_content)
-        print(f"\nİşlem tamamlandı! Yeni liste '{OUTPUT_FILENAME}' adıyla kaydedildi.")
-    else:
-        print("\nİşlem başarısız oldu.")
\ No newline at end of file
+    written = process_m3u_playlist(INPUT_PLAYLIST_URL, OUTPUT_FILENAME)
+
+    if written is None:
+        print("\nİşlem başarısız oldu.")
+    elif written:
+        print(f"\nİşlem tamamlandı! Yeni liste '{OUTPUT_FILENAME}' adıyla kaydedildi.")
\ No newline at end of file
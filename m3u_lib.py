@@ -0,0 +1,202 @@
+# m3u_lib.py
+# Tüm betiklerin ortak kullandığı akış tabanlı M3U okuyucu/yazıcı.
+# Dosya satır satır okunur; her giriş (#EXTINF + seçenek satırları + URL)
+# tek bir kayıt olarak üretilir ve yazıcıya anında aktarılabilir.
+
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+
+from extinf import parse_extinf
+
+HEADER = "#EXTM3U"
+
+
+class M3UEntry:
+    """Tek bir çalma listesi girişi: #EXTINF satırı, seçenek satırları ve URL."""
+
+    __slots__ = ("_extinf", "_info", "options", "url")
+
+    def __init__(self, extinf, url, options=None):
+        self._extinf = extinf
+        self._info = None
+        self.url = url
+        self.options = options if options is not None else []
+
+    @property
+    def extinf(self):
+        """Ham #EXTINF satırı. Özellik düzenlendiyse parçalardan yeniden oluşturulur."""
+        if self._extinf is None and self._info is not None:
+            self._extinf = str(self._info)
+        return self._extinf
+
+    @extinf.setter
+    def extinf(self, value):
+        self._extinf = value
+        self._info = None
+
+    @property
+    def info(self):
+        """Ayrıştırılmış #EXTINF satırı (ExtInf). İlk erişimde ayrıştırılır."""
+        if self._info is None:
+            self._info = parse_extinf(self._extinf or "")
+        return self._info
+
+    @property
+    def attrs(self):
+        """#EXTINF özellikleri (tvg-id, group-title, ...)."""
+        return self.info.attrs
+
+    @property
+    def title(self):
+        """Görünen kanal/film adı."""
+        return self.info.title
+
+    def get_attr(self, key, default=None):
+        return self.info.get(key, default)
+
+    def set_attr(self, key, value):
+        """Tek bir #EXTINF özelliğini satırı yeniden ayrıştırmadan değiştirir."""
+        self.info.set(key, value)
+        self._extinf = None
+
+    def replace_attr(self, key, value):
+        """Özelliğin satırdaki tüm tekrarlarını değiştirir; özellik yoksa eklemez."""
+        if self.info.replace(key, value):
+            self._extinf = None
+
+    def lines(self):
+        """Girişi dosyaya yazılacak satırlar olarak döndürür."""
+        if self.extinf:
+            yield self.extinf
+        yield from self.options
+        yield self.url
+
+    def __repr__(self):
+        return f"M3UEntry({self.title!r}, {self.url!r})"
+
+
+class M3UReader:
+    """
+    Satır kaynağından (dosya nesnesi, liste, iter_lines ...) girişleri
+    tek geçişte üreten okuyucu. Bütün içerik belleğe alınmaz.
+
+    Okuma sırasında doldurulan alanlar:
+      header  -> ilk satır #EXTM3U ise o satır, değilse None
+      dangling -> URL'si olmadan kalan #EXTINF sayısı
+    """
+
+    def __init__(self, lines):
+        self._lines = lines
+        self.header = None
+        self.dangling = 0
+
+    def __iter__(self):
+        extinf = None
+        options = []
+        first = True
+        for raw in self._lines:
+            if isinstance(raw, bytes):
+                raw = raw.decode("utf-8", "replace")
+            line = raw.strip()
+            if first:
+                first = False
+                line = line.lstrip("\ufeff")
+                if line.startswith(HEADER):
+                    self.header = line
+                    continue
+            if not line:
+                continue
+            if line.startswith("#EXTINF"):
+                if extinf is not None:
+                    self.dangling += 1
+                extinf = line
+                options = []
+            elif line.startswith("#"):
+                # #EXTVLCOPT, #EXTGRP, #KODIPROP ... sadece bir girişe aitse korunur
+                if extinf is not None:
+                    options.append(line)
+            else:
+                yield M3UEntry(extinf, line, options)
+                extinf = None
+                options = []
+        if extinf is not None:
+            self.dangling += 1
+
+
+def iter_entries(lines):
+    """Satır kaynağındaki girişleri sırayla üretir."""
+    return iter(M3UReader(lines))
+
+
+def read_header(lines):
+    """
+    (başlık, girişler) döndürür. Kaynağın #EXTM3U satırı x-tvg-url gibi
+    özellikleriyle birlikte olduğu gibi alınır; yoksa HEADER kullanılır.
+    Başlık yazıcı açılmadan bilinsin diye yalnızca ilk giriş önceden okunur.
+    """
+    reader = M3UReader(lines)
+    entries = iter(reader)
+    first = next(entries, None)
+    if first is None:
+        return reader.header or HEADER, iter(())
+    return reader.header or HEADER, itertools.chain([first], entries)
+
+
+class M3UWriter:
+    """Girişleri geldikçe dosyaya yazan artımlı yazıcı."""
+
+    def __init__(self, f, header=HEADER):
+        self._f = f
+        self.count = 0
+        if header:
+            f.write(header + "\n")
+
+    def write(self, entry):
+        for line in entry.lines():
+            self._f.write(line + "\n")
+        self.count += 1
+
+    def write_raw(self, line):
+        """Bir girişe ait olmayan satırı (ör. grup ayırıcı) olduğu gibi yazar."""
+        self._f.write(line + "\n")
+
+    def write_all(self, entries):
+        for entry in entries:
+            self.write(entry)
+        return self.count
+
+
+def iter_response_lines(response):
+    """
+    stream=True ile açılmış bir requests yanıtının satırlarını indirme
+    sürerken üretir; gövde hiçbir zaman bütünüyle belleğe alınmaz.
+    """
+    if not response.encoding:
+        response.encoding = "utf-8"
+    return response.iter_lines(decode_unicode=True)
+
+
+@contextmanager
+def atomic_write(path, encoding="utf-8", keep=None, binary=False):
+    """
+    Aynı klasörde geçici bir dosyaya yazar ve blok hatasız biterse hedefin
+    üzerine atomik olarak taşır. Hata olursa eski dosya olduğu gibi kalır.
+    keep verilirse blok sonunda çağrılır; False dönerse geçici dosya silinir
+    ve hedefe hiç dokunulmaz. binary=True ile dosya bayt modunda açılır.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".m3u", dir=directory)
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding=encoding)) as f:
+            yield f
+        if keep is not None and not keep():
+            os.remove(tmp_path)
+            return
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
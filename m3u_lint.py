@@ -0,0 +1,292 @@
+# m3u_lint.py
+# Tek geçişli, akış tabanlı M3U denetleyicisi ve istatistik raporu.
+#
+# Dosya satır satır okunur; bellek kullanımı liste boyutundan bağımsızdır:
+#   - tekrarlanan URL'ler sabit boyutlu bir Bloom filtresiyle sayılır
+#     (çok nadir yanlış pozitif olabilir, rapor "yaklaşık" olarak işaretler),
+#   - host dağılımı için en sık K host "space-saving" sayacıyla izlenir,
+#   - en uzun satırlar küçük bir yığında, ortalama/sapma Welford ile tutulur,
+#   - her sorun türü için sadece sayı ve ilk birkaç satır numarası saklanır.
+#
+# Kullanım:
+#   python m3u_lint.py son_liste.m3u                  # JSON raporu stdout'a
+#   python m3u_lint.py a.m3u b.m3u -o rapor.json      # rapor dosyaya
+#   python m3u_lint.py son_liste.m3u --strict         # hata varsa çıkış kodu 1
+#   python m3u_lint.py playlist.m3u --strict --allow-empty
+#
+# --strict yalnızca "hata" düzeyindeki sorunlarda (boş liste, eksik başlık)
+# başarısız olur; uyarılar rapora yazılır ama iş akışını durdurmaz.
+# --allow-empty boş listeyi uyarıya indirir: kaynak kapalıyken bilerek
+# yalnızca başlık yazan betiklerin iş akışı bu yüzden kırmızıya dönmez.
+
+import hashlib
+import heapq
+import json
+import math
+import sys
+
+from extinf import parse_extinf
+from m3u_lib import HEADER
+from url_rules import _split_url
+
+EXAMPLES = 20
+TOP_HOSTS = 32
+LONGEST_LINES = 10
+# Bu uzunluğu aşan satırlar sorun olarak raporlanır
+MAX_LINE_LENGTH = 4096
+# Bloom filtresi: 2^26 bit = 8 MiB, 3 özet; ~1M URL'de yanlış pozitif < %0.1
+BLOOM_BITS = 1 << 26
+BLOOM_HASHES = 3
+
+ERRORS = ("empty", "missing_header")
+STREAM_SCHEMES = ("http://", "https://", "rtmp://", "rtsp://", "udp://", "rtp://", "mms://")
+
+
+class _Bloom:
+    __slots__ = ("_bits", "_mask")
+
+    def __init__(self, bits=BLOOM_BITS):
+        self._bits = bytearray(bits // 8)
+        self._mask = bits - 1
+
+    def add(self, text):
+        """Öğeyi ekler; daha önce (muhtemelen) eklenmişse True döndürür."""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8 * BLOOM_HASHES).digest()
+        seen = True
+        for i in range(BLOOM_HASHES):
+            bit = int.from_bytes(digest[i * 8:i * 8 + 8], "little") & self._mask
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self._bits[byte] & mask:
+                seen = False
+                self._bits[byte] |= mask
+        return seen
+
+
+class _TopK:
+    """Space-saving algoritması: en sık K öğeyi sabit bellekle yaklaşık sayar."""
+
+    __slots__ = ("_k", "_counts")
+
+    def __init__(self, k=TOP_HOSTS):
+        self._k = k
+        self._counts = {}
+
+    def add(self, item):
+        counts = self._counts
+        if item in counts:
+            counts[item] += 1
+        elif len(counts) < self._k:
+            counts[item] = 1
+        else:
+            # En az sayılan öğe çıkarılır, yeni öğe onun sayısını devralır
+            victim = min(counts, key=counts.get)
+            counts[item] = counts.pop(victim) + 1
+
+    def most_common(self):
+        return sorted(self._counts.items(), key=lambda kv: kv[1], reverse=True)
+
+
+class _Issue:
+    __slots__ = ("count", "lines")
+
+    def __init__(self):
+        self.count = 0
+        self.lines = []
+
+    def add(self, line_no):
+        self.count += 1
+        if len(self.lines) < EXAMPLES:
+            self.lines.append(line_no)
+
+
+class PlaylistLinter:
+    """Satırları tek tek alır; bitince report() JSON uyumlu sözlük döndürür."""
+
+    def __init__(self, name=""):
+        self.name = name
+        self.lines = 0
+        self.entries = 0
+        self.header = None
+        self.groups = {}
+        self.issues = {}
+        self.duplicates = 0
+        self.duplicate_examples = []
+        self._urls = _Bloom()
+        self._hosts = _TopK()
+        self._pending = None  # (satır no, #EXTINF satırı)
+        self._options = 0
+        self._first = True
+        self._longest = []
+        self._len_n = 0
+        self._len_mean = 0.0
+        self._len_m2 = 0.0
+        self._len_max = 0
+
+    def _issue(self, kind, line_no):
+        issue = self.issues.get(kind)
+        if issue is None:
+            issue = self.issues[kind] = _Issue()
+        issue.add(line_no)
+
+    def _measure(self, line_no, line):
+        n = len(line)
+        self._len_n += 1
+        delta = n - self._len_mean
+        self._len_mean += delta / self._len_n
+        self._len_m2 += delta * (n - self._len_mean)
+        self._len_max = max(self._len_max, n)
+        if len(self._longest) < LONGEST_LINES:
+            heapq.heappush(self._longest, (n, line_no))
+        elif n > self._longest[0][0]:
+            heapq.heapreplace(self._longest, (n, line_no))
+        if n > MAX_LINE_LENGTH:
+            self._issue("line_too_long", line_no)
+
+    def feed(self, raw):
+        self.lines += 1
+        line_no = self.lines
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8", "replace")
+        line = raw.strip()
+        if self._first:
+            line = line.lstrip("\ufeff")
+            if line:
+                self._first = False
+                if line.startswith(HEADER):
+                    self.header = line
+                    return
+                self._issue("missing_header", line_no)
+        if not line:
+            return
+        self._measure(line_no, line)
+
+        if line.startswith("#EXTINF"):
+            if self._pending is not None:
+                # Önceki #EXTINF URL'siz kaldı; merge_m3u bu girişi sessizce atar
+                self._issue("dangling_extinf", self._pending[0])
+            self._pending = (line_no, line)
+            self._options = 0
+        elif line.startswith("#"):
+            if line.startswith(HEADER):
+                self._issue("repeated_header", line_no)
+            elif self._pending is None and not line.startswith("#EXTGRP"):
+                # #EXTVLCOPT/#KODIPROP gibi satırlar bir girişe bağlı olmalıdır
+                self._issue("orphan_option", line_no)
+            else:
+                self._options += 1
+        else:
+            self._url(line_no, line)
+
+    def _url(self, line_no, url):
+        if self._pending is None:
+            self._issue("bare_url", line_no)
+            extinf = None
+        else:
+            extinf = self._pending[1]
+            self._pending = None
+        self.entries += 1
+
+        if not url.startswith(STREAM_SCHEMES):
+            self._issue("unknown_scheme", line_no)
+        host, _ = _split_url(url)
+        self._hosts.add(host or "(yok)")
+
+        if self._urls.add(url):
+            self.duplicates += 1
+            if len(self.duplicate_examples) < EXAMPLES:
+                self.duplicate_examples.append({"line": line_no, "url": url})
+
+        group = ""
+        if extinf is not None:
+            info = parse_extinf(extinf)
+            group = info.get("group-title") or ""
+            if not info.title:
+                self._issue("missing_title", line_no - 1 - self._options)
+        self.groups[group] = self.groups.get(group, 0) + 1
+
+    def close(self):
+        if self._pending is not None:
+            self._issue("dangling_extinf", self._pending[0])
+            self._pending = None
+        if self.entries == 0:
+            self._issue("empty", self.lines)
+
+    def errors(self, allow_empty=False):
+        return {kind: self.issues[kind].count for kind in ERRORS
+                if kind in self.issues and not (allow_empty and kind == "empty")}
+
+    def report(self):
+        stdev = math.sqrt(self._len_m2 / self._len_n) if self._len_n else 0.0
+        return {
+            "file": self.name,
+            "lines": self.lines,
+            "entries": self.entries,
+            "header": self.header,
+            "errors": self.errors(),
+            "issues": {
+                kind: {"count": issue.count, "lines": issue.lines}
+                for kind, issue in sorted(self.issues.items())
+            },
+            "groups": dict(sorted(self.groups.items(), key=lambda kv: kv[1], reverse=True)),
+            "duplicate_urls": {
+                "count": self.duplicates,
+                "approximate": True,
+                "examples": self.duplicate_examples,
+            },
+            "hosts": [{"host": h, "count": c} for h, c in self._hosts.most_common()],
+            "line_length": {
+                "max": self._len_max,
+                "mean": round(self._len_mean, 1),
+                "stdev": round(stdev, 1),
+                "longest": [{"line": no, "length": n} for n, no in sorted(self._longest, reverse=True)],
+            },
+        }
+
+
+def lint_lines(lines, name=""):
+    linter = PlaylistLinter(name)
+    for line in lines:
+        linter.feed(line)
+    linter.close()
+    return linter
+
+
+def lint_file(path):
+    """Dosyayı akış halinde denetler ve PlaylistLinter döndürür."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return lint_lines(f, path)
+
+
+def main(argv):
+    strict = "--strict" in argv
+    allow_empty = "--allow-empty" in argv
+    output = argv[argv.index("-o") + 1] if "-o" in argv else None
+    paths = [a for i, a in enumerate(argv) if not a.startswith("-") and (i == 0 or argv[i - 1] != "-o")]
+    if not paths:
+        print("Kullanım: python m3u_lint.py liste.m3u [...] [-o rapor.json] [--strict] [--allow-empty]")
+        return 2
+
+    reports = []
+    failed = False
+    for path in paths:
+        linter = lint_file(path)
+        reports.append(linter.report())
+        issues = ", ".join(f"{k}={v.count}" for k, v in sorted(linter.issues.items())) or "sorun yok"
+        # Özet stderr'e yazılır; stdout'taki JSON temiz kalır
+        print(f"{path}: {linter.entries} giriş, {len(linter.groups)} grup, "
+              f"~{linter.duplicates} tekrar URL; {issues}", file=sys.stderr)
+        if linter.errors(allow_empty):
+            failed = True
+
+    report = reports[0] if len(reports) == 1 else reports
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    return 1 if strict and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
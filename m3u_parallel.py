@@ -0,0 +1,148 @@
+# m3u_parallel.py
+# Çok büyük listeler için süreç havuzunda paralel ayrıştırma.
+#
+# Girdi (dosya veya bayt dizisi) kabaca eşit parçalara bölünür; bölme noktası
+# her zaman bir "\n#EXTINF" dizisinin başına kaydırılır, böylece hiçbir giriş
+# iki parçaya düşmez. Sınırlar satır satır tarama yapılmadan tek bir bytes.find
+# ile bulunur. Her parça ayrı bir süreçte M3UReader ile ayrıştırılır ve
+# sonuçlar orijinal sırayla birleştirilir. Küçük girdiler için süreç başlatma
+# maliyeti kazançtan büyük olduğundan tek süreçte okunur.
+#
+# Satırları girişlere ayırmak tek başına ucuzdur; kayıtların süreçler arası
+# aktarımı bu kazancın çoğunu geri alır. Asıl kazanç giriş başına pahalı
+# işlerin (ör. url_key ile kanonik anahtar) de işçi süreçte yapılmasıdır:
+# keyfunc verilirse her giriş (giriş, anahtar) çifti olarak üretilir.
+#
+# Kullanım:
+#   python m3u_parallel.py merged_playlist.m3u movies.m3u
+
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from m3u_lib import M3UEntry, M3UReader
+
+# Bu boyutun altındaki girdiler tek süreçte ayrıştırılır
+MIN_PARALLEL_BYTES = 8 << 20
+# Süreç başına hedeflenen en küçük parça
+MIN_CHUNK_BYTES = 2 << 20
+
+_BOUNDARY = b"\n#EXTINF"
+
+
+def split_chunks(buf, parts):
+    """
+    Tamponu en fazla parts adet (başlangıç, bitiş) aralığına böler. Her aralık
+    (ilki hariç) bir #EXTINF satırıyla başlar.
+    """
+    size = len(buf)
+    parts = max(1, min(parts, size // MIN_CHUNK_BYTES or 1))
+    bounds = [0]
+    for i in range(1, parts):
+        target = max(size * i // parts, bounds[-1])
+        cut = buf.find(_BOUNDARY, target)
+        if cut < 0:
+            break
+        cut += 1  # "\n" önceki parçada kalır
+        if cut > bounds[-1]:
+            bounds.append(cut)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_bytes(task):
+    """Bir parçayı ayrıştırır; (başlık, sahipsiz #EXTINF sayısı, kayıtlar) döndürür."""
+    data, keyfunc = task
+    reader = M3UReader(data.decode("utf-8", "replace").splitlines())
+    # Kayıtlar düz demet olarak döner; süreçler arası aktarım ucuz kalır
+    if keyfunc is None:
+        records = [(e.extinf, e.url, e.options, None) for e in reader]
+    else:
+        records = [(e.extinf, e.url, e.options, keyfunc(e.url)) for e in reader]
+    return reader.header, reader.dangling, records
+
+
+def _parse_file_chunk(task):
+    path, start, end, keyfunc = task
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _parse_bytes((mm[start:end], keyfunc))
+
+
+class ParallelReader:
+    """
+    M3UReader ile aynı arayüz (header, dangling, girişler üzerinde yineleme);
+    ancak girdi parçalara bölünüp süreç havuzunda ayrıştırılır.
+    source bir dosya yolu ya da bytes/str içerik olabilir. keyfunc (modül
+    düzeyinde, süreçlere aktarılabilir bir fonksiyon) verilirse URL'ye
+    uygulanır ve girişler yerine (giriş, anahtar) çiftleri üretilir.
+    """
+
+    def __init__(self, source, workers=None, keyfunc=None):
+        self._source = source
+        self.keyfunc = keyfunc
+        self.workers = workers or os.cpu_count() or 1
+        self.header = None
+        self.dangling = 0
+        self.chunks = 0
+
+    def _tasks(self):
+        source = self._source
+        if isinstance(source, str) and os.path.exists(source):
+            size = os.path.getsize(source)
+            if size == 0:
+                return _parse_bytes, []
+            with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                chunks = split_chunks(mm, self._parts(size))
+            return _parse_file_chunk, [(source, start, end, self.keyfunc) for start, end in chunks]
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        chunks = split_chunks(source, self._parts(len(source)))
+        return _parse_bytes, [(source[start:end], self.keyfunc) for start, end in chunks]
+
+    def _parts(self, size):
+        if size < MIN_PARALLEL_BYTES or self.workers < 2:
+            return 1
+        return self.workers
+
+    def __iter__(self):
+        func, tasks = self._tasks()
+        self.chunks = len(tasks)
+        if len(tasks) <= 1:
+            results = map(func, tasks)
+            yield from self._merge(results)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            # map sonuçları gönderim sırasıyla döndürür; ilk parça biter bitmez akış başlar
+            yield from self._merge(pool.map(func, tasks))
+
+    def _merge(self, results):
+        for i, (header, dangling, records) in enumerate(results):
+            if i == 0:
+                self.header = header
+            self.dangling += dangling
+            if self.keyfunc is None:
+                for extinf, url, options, _key in records:
+                    yield M3UEntry(extinf, url, options)
+            else:
+                for extinf, url, options, key in records:
+                    yield M3UEntry(extinf, url, options), key
+
+
+def parse_parallel(source, workers=None, keyfunc=None):
+    """Girişleri sırayla üreten ParallelReader döndürür."""
+    return ParallelReader(source, workers, keyfunc)
+
+
+def main(paths):
+    for path in paths:
+        started = time.perf_counter()
+        reader = ParallelReader(path)
+        count = sum(1 for _ in reader)
+        print(f"{path}: {count} giriş, {reader.chunks} parça, {reader.workers} süreç, "
+              f"{time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
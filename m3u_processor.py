@@ -1,49 +1,49 @@
 import requests
 import os
 
+import http_client
+from m3u_delta import write_playlist
+from m3u_lib import iter_response_lines, read_header
+from url_rules import compile_rules
+
 # Kaynak M3U URL'si
 source_url = "https://rideordie.serv00.net/iptv/vavoo/tr.php"
 
 # URL'lerin başına eklenecek ve linklerin çalışmasını sağlayacak olan proxy ön eki
 proxy_prefix = "https://pulutotv-alsancak.hf.space/proxy/m3u?url="
 
+# Her medya linkine proxy ön ekini ekleyen kural
+# Bu proxy base64 şifreleme beklemediği için URL'yi olduğu gibi ekliyoruz
+rewrite_rules = compile_rules([{"host": "*", "prefix": proxy_prefix}])
+
 # Oluşturulacak yeni dosyanın adı
 output_filename = "tr_list.m3u"
 
 def process_m3u():
     """
-    M3U listesini kaynaktan çeker, her medya linkinin başına
-    belirtilen proxy URL'sini ekler ve yeni bir dosyaya yazar.
+    M3U listesini kaynaktan akış halinde çeker, her medya linkinin başına
+    belirtilen proxy URL'sini ekler ve geçici dosya üzerinden atomik olarak yazar.
     """
     print(f"'{source_url}' adresinden M3U listesi alınıyor...")
     
     try:
-        # Belirtilen URL'den M3U içeriğini al
-        response = requests.get(source_url, timeout=15)
-        response.raise_for_status()  # HTTP 200 olmayan durumlar için hata fırlat
-        
-        # İçeriği satırlara ayır
-        original_lines = response.text.splitlines()
-        
-        new_lines = []
-        
-        # Her satırı işle
-        for line in original_lines:
-            # URL satırlarını bul (genellikle # ile başlamazlar ve boştur)
-            if line.strip() and not line.strip().startswith("#"):
-                # Yeni proxy URL'sini oluştur
-                # Bu proxy base64 şifreleme beklemediği için URL'yi olduğu gibi ekliyoruz
-                new_url = proxy_prefix + line.strip()
-                new_lines.append(new_url)
-            else:
-                # #EXTM3U veya #EXTINF gibi diğer satırları olduğu gibi ekle
-                new_lines.append(line)
-        
-        # Yeni M3U içeriğini dosyaya yaz
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(new_lines))
+        # Belirtilen URL'den M3U içeriğini akış halinde al
+        with http_client.get(source_url, timeout=15, stream=True) as response:
+            response.raise_for_status()  # HTTP 200 olmayan durumlar için hata fırlat
+            
+            # Girişleri indirme sürerken işle ve geçici dosyaya yaz
+            # Kaynağın başlık satırı (x-tvg-url vb.) korunur
+            header, entries = read_header(iter_response_lines(response))
+            with write_playlist(output_filename, header=header) as writer:
+                for entry in entries:
+                    # Yeni proxy URL'sini oluştur
+                    rewrite_rules.apply_entry(entry)
+                    writer.write(entry)
             
-        print(f"İşlem tamamlandı. Liste '{output_filename}' dosyasına kaydedildi.")
+        if writer.has_changes():
+            print(f"İşlem tamamlandı. Liste '{output_filename}' dosyasına kaydedildi. ({writer.summary()})")
+        else:
+            print(f"'{output_filename}' güncel, değişiklik yok.")
         
     except requests.exceptions.RequestException as e:
         print(f"Hata: M3U listesi alınamadı. {e}")
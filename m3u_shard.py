@@ -0,0 +1,123 @@
+# m3u_shard.py
+# Büyük bir listeyi group-title değerine göre grup başına ayrı dosyalara
+# (parçalara) böler ve parçalara bağlanan küçük bir dizin listesi yazar.
+# Yalnızca "Filmler" ya da tek bir ülke isteyen istemci tüm listeyi indirmek
+# yerine dizinden ilgili parçayı açar.
+#
+#   radio/index.m3u     ->  #EXTINF:-1 group-title="Turkey",Turkey (812)
+#                           Turkey.m3u
+#   radio/Turkey.m3u    ->  yalnızca Turkey grubundaki girişler
+#
+# Parçalar iş parçacıklarıyla eşzamanlı ve write_playlist ile yazılır; içeriği
+# değişmeyen parçaya dokunulmaz. Artık var olmayan grupların parçaları silinir;
+# yalnızca önceki index.m3u'da listelenen dosyalara dokunulur, klasördeki
+# başka .m3u dosyaları olduğu gibi kalır.
+
+import os
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from m3u_compress import remove_artifacts
+from m3u_delta import write_playlist
+from m3u_lib import HEADER, M3UEntry, iter_entries
+
+INDEX_NAME = "index.m3u"
+DEFAULT_GROUP = "Diğer"
+
+_TR_ASCII = str.maketrans({
+    "ç": "c", "Ç": "C", "ğ": "g", "Ğ": "G", "ı": "i", "İ": "I",
+    "ö": "o", "Ö": "O", "ş": "s", "Ş": "S", "ü": "u", "Ü": "U",
+})
+
+
+def shard_filename(group):
+    """Grup adından dosya sistemi ve URL için güvenli bir parça adı üretir."""
+    # Türkçe harfler elle, diğer aksanlı harfler (ör. "Côte") NFKD ile sadeleştirilir
+    text = unicodedata.normalize("NFKD", group.translate(_TR_ASCII))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("._")
+    return (name or "grup") + ".m3u"
+
+
+def group_entries(entries, default=DEFAULT_GROUP):
+    """Girişleri ilk görülme sırasını koruyarak {grup: [girişler]} olarak toplar."""
+    groups = {}
+    for entry in entries:
+        group = (entry.get_attr("group-title") if entry.extinf else None) or default
+        groups.setdefault(group, []).append(entry)
+    return groups
+
+
+def _previous_shards(index_path):
+    """Önceki index.m3u'nun bağlandığı parça dosyalarının adları."""
+    try:
+        with open(index_path, encoding="utf-8", errors="replace") as f:
+            return {entry.url.rsplit("/", 1)[-1] for entry in iter_entries(f)}
+    except OSError:
+        return set()
+
+
+def _write_shard(path, entries, header):
+    with write_playlist(path, header=header, delta_file=False) as writer:
+        writer.write_all(entries)
+    return writer.count, writer.has_changes()
+
+
+def write_shards(directory, groups, header=HEADER, base_url="", max_workers=8):
+    """
+    {grup: [girişler]} sözlüğünü directory altına grup başına bir dosya olarak
+    eşzamanlı yazar ve aynı klasöre index.m3u dizin listesini oluşturur.
+    base_url verilirse dizindeki bağlantılar mutlak olur (ör. raw.githubusercontent
+    adresi); verilmezse dizine göre göreli dosya adları kullanılır.
+    {grup: (dosya adı, giriş sayısı, değişti_mi)} döndürür.
+    """
+    os.makedirs(directory, exist_ok=True)
+    index_path = os.path.join(directory, INDEX_NAME)
+    previous = _previous_shards(index_path)
+
+    names = {}
+    used = set()
+    for group in groups:
+        name = shard_filename(group)
+        stem, n = name[:-4], 2
+        # Farklı gruplar aynı ada düşerse (ör. "Ç" ve "C") numaralandır
+        while name.lower() in used or name.lower() == INDEX_NAME:
+            name = f"{stem}_{n}.m3u"
+            n += 1
+        used.add(name.lower())
+        names[group] = name
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as ex:
+        futures = {
+            group: ex.submit(_write_shard, os.path.join(directory, names[group]), entries, header)
+            for group, entries in groups.items()
+        }
+        for group, future in futures.items():
+            count, changed = future.result()
+            results[group] = (names[group], count, changed)
+
+    with write_playlist(index_path, header=header, delta_file=False) as writer:
+        for group, (name, count, _changed) in results.items():
+            safe_group = group.replace('"', "'")
+            writer.write(M3UEntry(
+                f'#EXTINF:-1 group-title="{safe_group}",{group} ({count})',
+                base_url.rstrip("/") + "/" + name if base_url else name,
+            ))
+
+    # Artık olmayan grupların parçalarını (ve sıkıştırılmış kopyalarını) temizle
+    keep = {name for name, _, _ in results.values()} | {INDEX_NAME}
+    for name in previous - keep:
+        path = os.path.join(directory, name)
+        if name.endswith(".m3u") and os.path.isfile(path):
+            os.remove(path)
+            remove_artifacts(path)
+
+    return results
+
+
+def shard_summary(results):
+    changed = sum(1 for _, _, c in results.values() if c)
+    total = sum(count for _, count, _ in results.values())
+    return f"{len(results)} parça, {total} giriş, {changed} parça güncellendi"
@@ -1,16 +1,33 @@
 # Gerekli kütüphaneleri içe aktaralım
-import requests
 import os
+import sys
+import json
+import time
 from datetime import datetime
 
-# URL'ler öncelik sırasına göre tanımlanmıştır.
-# İlk URL'nin içeriği, birleştirilmiş dosyanın en başına eklenecektir.
-SOURCE_URLS = [
-    "https://raw.githubusercontent.com/ahmet21ahmet/Filmdizi/main/filmler.m3u",
-    "https://raw.githubusercontent.com/ahmet21ahmet/Bo-/main/movies.m3u"
-]
-
-# Çıktı olarak oluşturulacak dosyanın adı
+from http_cache import SourceCache
+from http_fetch import fetch_many
+from m3u_index import M3UIndex
+from m3u_delta import write_playlist
+from m3u_lib import HEADER, M3UReader
+from m3u_shard import INDEX_NAME, group_entries, shard_summary, write_shards
+from title_cluster import TitleClusterer
+from m3u_parallel import MIN_PARALLEL_BYTES, ParallelReader
+from url_key import KeyIndex, url_key
+
+# Kaynak listeler bu yapılandırma dosyasından okunur. "sources" içindeki sıra
+# önceliktir: aynı yayın birden fazla kaynakta varsa ilk kaynaktaki giriş kalır.
+# Yayınlar kanonik URL anahtarıyla karşılaştırılır (bkz. url_key.py); proxy ile
+# sarmalanmış adres ile çıplak adres aynı giriş sayılır. "collapse_titles": true
+# verilirse farklı adreslerdeki aynı film (başlık + yıl kümesi, bkz.
+# title_cluster.py) de yalnızca bir kez yazılır. "shard_dir" verilirse (varsayılan
+# kapalı) birleşik liste ayrıca group-title başına parçalara ve bir index.m3u
+# dosyasına bölünür; klasör iş akışında depoya işleneceği için bilerek açılmalıdır.
+# "local" verilen kaynakların yerel kopyası mevcutsa indirme yapılmaz,
+# girişler mmap ofset indeksi (ör. movies.m3u.idx) üzerinden okunur.
+CONFIG_FILE = "merge_sources.json"
+
+# Yapılandırmada belirtilmezse kullanılacak çıktı dosyası
 OUTPUT_FILE = "merged_playlist.m3u"
 # Hata günlüğü için dosya adı
 ERROR_LOG_FILE = "error_log.txt"
@@ -22,84 +39,198 @@ def log_error(message):
 
 def parse_m3u(content):
     """
-    M3U içeriğini ayrıştırır ve her bir girişi (bilgi satırı ve URL)
-    bir demet olarak içeren SIRALI bir liste döndürür.
-    Bu fonksiyon, dosyadaki orijinal sıralamayı ve grup bilgilerini korur.
+    M3U içeriğini ayrıştırır ve (giriş, kanonik URL anahtarı) çiftlerini
+    orijinal sırasıyla tek geçişte üretir. URL'si olmayan #EXTINF satırları
+    atlanır. Çok büyük içerik parçalara bölünüp süreç havuzunda ayrıştırılır;
+    URL anahtarları da işçi süreçlerde hesaplanır (bkz. m3u_parallel.py).
     """
-    entries = []
-    lines = content.strip().split('\n')
+    if len(content) >= MIN_PARALLEL_BYTES:
+        reader = pairs = ParallelReader(content, keyfunc=url_key)
+    else:
+        reader = M3UReader(content.splitlines())
+        pairs = ((entry, url_key(entry.url)) for entry in reader)
+    for entry, key in pairs:
+        # Bilgi satırı olmayan çıplak URL'leri atla
+        if entry.extinf:
+            yield entry, key
 
     # Dosyanın #EXTM3U başlığıyla başlayıp başlamadığını kontrol et
-    if not lines or not lines[0].strip().startswith("#EXTM3U"):
+    if reader.header is None:
         log_error("Uyarı: M3U dosyası standart #EXTM3U başlığına sahip değil.")
-        i = 0
-    else:
-        i = 1 # Başlığı atla
-
-    while i < len(lines):
-        line = lines[i].strip()
-        # Eğer satır bir medya bilgisi içeriyorsa (#EXTINF)
-        if line.startswith("#EXTINF:"):
-            # Bir sonraki satırın var ve boş olmadığını kontrol et (URL satırı)
-            if i + 1 < len(lines) and lines[i+1].strip():
-                info_line = line
-                url_line = lines[i+1].strip()
-                # Bilgi satırını ve URL'yi olduğu gibi listeye ekle
-                entries.append((info_line, url_line))
-                i += 2 # İki satır atla (bilgi ve URL)
-            else:
-                # Eşleşmeyen #EXTINF satırını atla
-                i += 1
+    if reader.dangling:
+        log_error(f"Uyarı: URL'si olmayan {reader.dangling} #EXTINF satırı atlandı.")
+
+def load_config(path=CONFIG_FILE):
+    """Birleştirme yapılandırmasını (kaynaklar, çıktı, eşzamanlılık) okur."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    for i, source in enumerate(config.get("sources", [])):
+        source.setdefault("name", source.get("url") or f"kaynak-{i + 1}")
+    return config
+
+class SourceStats:
+    """Bir kaynağın indirme süresi ve birleştirmeye katkısı."""
+
+    def __init__(self, name):
+        self.name = name
+        self.status = "bekliyor"
+        self.fetch_seconds = 0.0
+        self.merge_seconds = 0.0
+        self.found = 0
+        self.added = 0
+        self.similar = 0
+
+    @property
+    def duplicates(self):
+        return self.found - self.added - self.similar
+
+    def as_row(self):
+        return (f"  {self.name[:32]:<32} {self.status:<6} {self.fetch_seconds:>7.2f}s "
+                f"{self.merge_seconds:>6.2f}s {self.found:>7} {self.added:>7} {self.duplicates:>7} {self.similar:>7}")
+
+def load_local(path, cache=None):
+    """Yerel kaynağı indeksinden yükler; (girişler, durum, süre) döndürür."""
+    start = time.perf_counter()
+    if cache:
+        cache.record_file(path)
+    entries = ((entry, url_key(entry.url)) for entry in M3UIndex.load_or_build(path))
+    return entries, "yerel", time.perf_counter() - start
+
+def _loaded_from(result, cache=None):
+    """fetch_many sonucunu (girişler, durum, süre) üçlüsüne çevirir."""
+    if result.status_code == 304 and cache:
+        cache.mark_unchanged(result.url)
+        return None, "304", result.elapsed
+    if not result.ok:
+        log_error(f"URL'den içerik alınamadı: {result.url} - Hata: {result.error or result.status_code}")
+        return None, "hata", result.elapsed
+    content = result.text
+    if cache:
+        cache.record_text(result.url, result, content)
+    if content:
+        return parse_m3u(content), "ok", result.elapsed
+    return None, "hata", result.elapsed
+
+def load_sources(sources, timeout=15, max_workers=8, cache=None):
+    """
+    Tüm kaynakları eşzamanlı indirir; süre kaynakların toplamı değil en yavaş
+    kaynak kadardır. Yerel kopyası olan kaynaklar indeksinden okunur.
+    Sonuçlar yapılandırmadaki sırayla (girişler, durum, süre) üçlüleri olarak
+    döner. cache verilirse istekler önceki ETag/Last-Modified ile gönderilir;
+    304 dönen kaynağın girişleri None, durumu "304" olur.
+    """
+    loaded = [None] * len(sources)
+    remote = []
+    for i, source in enumerate(sources):
+        local_path = source.get("local")
+        if local_path and os.path.exists(local_path):
+            loaded[i] = load_local(local_path, cache)
         else:
-            # #EXTINF olmayan satırları atla
-            i += 1
-
-    return entries
-
-def fetch_playlist(url):
-    """Verilen URL'den M3U içeriğini çeker."""
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status() # HTTP hata kodları için kontrol
-        return response.text
-    except requests.exceptions.RequestException as e:
-        log_error(f"URL'den içerik alınamadı: {url} - Hata: {e}")
-        return None
+            remote.append(i)
+
+    urls = [sources[i]["url"] for i in remote]
+    items = [(url, cache.conditional_headers(url) if cache else None) for url in urls]
+    # Kaynakların çoğu aynı host'ta (raw.githubusercontent.com); host sınırı toplam sınırla aynı
+    results = fetch_many(items, concurrency=max_workers, per_host=max_workers, timeout=timeout)
+    for i, result in zip(remote, results):
+        loaded[i] = _loaded_from(result, cache)
+    return loaded
+
+def merge_sources(sources, loaded, writer, collapse_titles=False):
+    """Yüklenen kaynakları yapılandırmadaki öncelik sırasıyla birleştirir."""
+    stats = [SourceStats(source["name"]) for source in sources]
+    seen = KeyIndex() # Tekrarları önlemek için kanonik URL anahtarlarını takip et
+    titles = TitleClusterer() if collapse_titles else None
+
+    for source, stat, (entries, status, seconds) in zip(sources, stats, loaded):
+        stat.status = status
+        stat.fetch_seconds = seconds
+        print(f"İşleniyor (Öncelik sırasına göre): {source['name']} [{stat.status}]")
+        if entries is None:
+            continue
+
+        start = time.perf_counter()
+        for entry, key in entries:
+            stat.found += 1
+            # Yayın daha önce eklenmemişse doğrudan dosyaya yaz
+            if not seen.add_key(key):
+                continue
+            # Farklı adresteki aynı film: önceki kaynaktaki giriş kalır
+            if titles is not None and not titles.add(entry)[1]:
+                stat.similar += 1
+                continue
+            writer.write(entry)
+            stat.added += 1
+        stat.merge_seconds = time.perf_counter() - start
+
+        print(f"  -> Bu listede {stat.found} giriş bulundu.")
+        print(f"  -> {stat.added} yeni ve benzersiz giriş eklendi.")
+
+    return stats
+
+def print_report(stats, wall_seconds):
+    """Kaynak başına süre ve isabet sayılarını tablo olarak yazdırır."""
+    print("\nKaynak raporu:")
+    print(f"  {'Kaynak':<32} {'Durum':<6} {'İndirme':>8} {'Birleş.':>7} {'Giriş':>7} {'Yeni':>7} {'Tekrar':>7} {'Benzer':>7}")
+    for stat in stats:
+        print(stat.as_row())
+    slowest = max((s.fetch_seconds for s in stats), default=0.0)
+    total = sum(s.fetch_seconds for s in stats)
+    print(f"  Toplam süre: {wall_seconds:.2f}s (en yavaş kaynak {slowest:.2f}s, sıralı olsaydı ~{total:.2f}s)")
 
 def main():
     """Ana betik mantığı."""
     print("M3U listeleri birleştirme işlemi başlatıldı...")
-
-    final_playlist_entries = []
-    seen_urls = set() # Tekrarları önlemek için URL'leri takip et
-
-    for url in SOURCE_URLS:
-        print(f"İşleniyor (Öncelik sırasına göre): {url}")
-        content = fetch_playlist(url)
-
+    config_path = sys.argv[1] if len(sys.argv) > 1 else CONFIG_FILE
+    config = load_config(config_path)
+    output_file = config.get("output", OUTPUT_FILE)
+    shard_dir = config.get("shard_dir")
+    sources = config.get("sources", [])
+    timeout = config.get("timeout", 15)
+    max_workers = config.get("max_workers", 8)
+    started = time.perf_counter()
+
+    # Betik veya yapılandırma değiştiyse önbellek geçersizdir ve her şey yeniden üretilir
+    outputs = [output_file] + ([os.path.join(shard_dir, INDEX_NAME)] if shard_dir else [])
+    cache = SourceCache("merge_m3u", salt_files=[__file__, config_path], outputs=outputs, keep_bodies=True)
+    loaded = load_sources(sources, timeout, max_workers, cache)
+    if cache.unchanged():
+        print("Hiçbir kaynak değişmedi (304 / aynı içerik); birleştirme atlandı.")
+        return
+
+    # Değişmeyen (304) kaynakların gövdesi önbellekten okunur; kayıtlı gövdesi
+    # olmayanlar birleştirme için koşulsuz indirilir
+    stale = []
+    for i, (_, status, seconds) in enumerate(loaded):
+        if status != "304":
+            continue
+        content = cache.body(sources[i]["url"])
         if content:
-            entries = parse_m3u(content)
-            print(f"  -> Bu listede {len(entries)} giriş bulundu.")
-
-            new_items_from_this_list = 0
-            for entry in entries:
-                # URL daha önce eklenmemişse listeye ekle
-                if entry[1] not in seen_urls:
-                    final_playlist_entries.append(entry)
-                    seen_urls.add(entry[1])
-                    new_items_from_this_list += 1
-
-            print(f"  -> {new_items_from_this_list} yeni ve benzersiz giriş eklendi.")
-
-    print(f"\nToplam {len(final_playlist_entries)} benzersiz giriş birleştirildi.")
-
-    print(f"Yeni liste dosyası ({OUTPUT_FILE}) yazılıyor...")
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write("#EXTM3U\n")
-        for entry in final_playlist_entries:
-            f.write(f"{entry[0]}\n")
-            f.write(f"{entry[1]}\n")
-
+            loaded[i] = (parse_m3u(content), status, seconds)
+        else:
+            stale.append(i)
+    for i, result in zip(stale, load_sources([sources[i] for i in stale], timeout, max_workers)):
+        loaded[i] = result
+
+    print(f"Yeni liste dosyası ({output_file}) yazılıyor...")
+    with write_playlist(output_file) as writer:
+        stats = merge_sources(sources, loaded, writer,
+                              collapse_titles=config.get("collapse_titles", False))
+
+    print(f"\nToplam {writer.count} benzersiz giriş birleştirildi.")
+    if writer.has_changes():
+        print(f"Değişiklikler: {writer.summary()}")
+    else:
+        print("Önceki listeye göre değişiklik yok, dosya yeniden yazılmadı.")
+    if shard_dir:
+        with open(output_file, encoding="utf-8") as f:
+            reader = M3UReader(f)
+            groups = group_entries(reader)
+        shards = write_shards(shard_dir, groups, header=reader.header or HEADER,
+                              base_url=config.get("shard_base_url", ""))
+        print(f"Gruplara bölündü ({shard_dir}/): {shard_summary(shards)}")
+    cache.save()
+    print_report(stats, time.perf_counter() - started)
     print("İşlem başarıyla tamamlandı!")
 
 if __name__ == "__main__":
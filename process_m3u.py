@@ -3,7 +3,11 @@
 # proxy linklerini temizler ve istenen formata dönüştürür.
 
 import requests
-import urllib.parse
+
+from http_cache import SourceCache
+from m3u_delta import write_playlist
+from m3u_lib import read_header
+from url_rules import compile_rules
 
 # İşlenecek olan M3U dosyasının URL'si
 SOURCE_URL = "https://raw.githubusercontent.com/zerodayip/m3u8file/main/rec%2Frecfilm.m3u"
@@ -14,87 +18,54 @@ USER_AGENT = "okhttp/4.12.0"
 # Kullanılacak olan sabit Referrer değeri
 REFERRER = "https://twitter.com/"
 
+# Proxy linklerini çözen kural: 'url' parametresindeki asıl medya URL'si alınır
+# ve sabit Referrer/User-Agent bilgileri #EXTVLCOPT olarak eklenir.
+RULES = compile_rules([
+    {
+        "contains": "zeroipday-zeroipday.hf.space/proxy/m3u",
+        "extract": "url",
+        "unquote": True,
+        "headers": {"http-referrer": REFERRER, "http-user-agent": USER_AGENT},
+    },
+])
+
+def process_entry(entry):
+    """
+    Proxy formatındaki URL'yi çözer ve sabit başlıkları #EXTVLCOPT olarak ekler.
+    Proxy değilse veya çözülemezse girişi olduğu gibi döndürür.
+    """
+    RULES.apply_entry(entry)
+    return entry
+
 def process_m3u_playlist():
     """
-    M3U dosyasını indirir, linkleri işler ve yeni bir dosyaya kaydeder.
+    M3U dosyasını akış halinde indirir, her girişi geldiği anda işler ve
+    geçici bir dosyaya yazar; iş bitince çıktı dosyası atomik olarak değiştirilir.
     """
     print(f"M3U dosyası indiriliyor: {SOURCE_URL}")
     try:
-        # Kaynak URL'den içeriği al
-        response = requests.get(SOURCE_URL, timeout=15)
-        response.raise_for_status()  # Hata durumunda exception fırlat
-        content = response.text
+        # Kaynak URL'den içeriği akış halinde al; önceki ETag/Last-Modified gönderilir
+        cache = SourceCache("process_m3u", salt_files=[__file__], outputs=[OUTPUT_FILE])
+        with cache.get(SOURCE_URL, timeout=15, stream=True) as response:
+            if cache.not_modified(response):
+                print("Kaynak değişmedi (304), dönüştürme atlandı.")
+                return
+            response.raise_for_status()  # Hata durumunda exception fırlat
+
+            print(f"İşlenmiş M3U dosyası kaydediliyor: {OUTPUT_FILE}")
+            # Kaynağın başlık satırı (x-tvg-url vb.) korunur
+            header, entries = read_header(cache.iter_lines(SOURCE_URL, response))
+            with write_playlist(OUTPUT_FILE, header=header) as writer:
+                for entry in entries:
+                    if entry.extinf:
+                        writer.write(process_entry(entry))
+        cache.save()
+        if writer.has_changes():
+            print(f"İşlem başarıyla tamamlandı. Değişiklikler: {writer.summary()}")
+        else:
+            print("Listede değişiklik yok, dosya yeniden yazılmadı.")
     except requests.exceptions.RequestException as e:
         print(f"Kaynak M3U dosyası indirilirken hata oluştu: {e}")
-        return
-
-    lines = content.splitlines()
-    processed_lines = []
-
-    # M3U dosyasının başlığını kontrol et ve ekle
-    if lines and lines[0].strip() == "#EXTM3U":
-        processed_lines.append(lines[0].strip())
-
-    # Satırları döngüye alarak işle
-    # Genellikle #EXTINF ve URL satırları çift olarak gelir
-    i = 1
-    while i < len(lines):
-        line = lines[i].strip()
-
-        # Eğer satır bir kanal bilgisi içeriyorsa (#EXTINF)
-        if line.startswith("#EXTINF"):
-            extinf_line = line
-
-            # Sonraki satırın URL olması beklenir
-            i += 1
-            if i < len(lines):
-                url_line = lines[i].strip()
-
-                # URL'nin proxy formatında olup olmadığını kontrol et
-                if "zeroipday-zeroipday.hf.space/proxy/m3u" in url_line:
-                    try:
-                        # Proxy URL'sini parçalarına ayır
-                        parsed_proxy_url = urllib.parse.urlparse(url_line)
-                        query_params = urllib.parse.parse_qs(parsed_proxy_url.query)
-
-                        # Sadece 'url' parametresini al
-                        actual_url_encoded = query_params.get('url', [None])[0]
-                        
-                        if actual_url_encoded:
-                            # Asıl medya URL'sini decode et
-                            actual_url = urllib.parse.unquote(actual_url_encoded)
-
-                            # Önce kanal bilgisini ekle
-                            processed_lines.append(extinf_line)
-
-                            # Sabit Referrer ve User-Agent bilgilerini #EXTVLCOPT olarak ekle
-                            processed_lines.append(f'#EXTVLCOPT:http-referrer={REFERRER}')
-                            processed_lines.append(f'#EXTVLCOPT:http-user-agent={USER_AGENT}')
-
-                            # Son olarak temizlenmiş medya URL'sini ekle
-                            processed_lines.append(actual_url)
-                        else:
-                            # 'url' parametresi bulunamazsa, orijinal satırları koru
-                            processed_lines.append(extinf_line)
-                            processed_lines.append(url_line)
-
-                    except (KeyError, IndexError, TypeError):
-                        # URL parse edilirken bir hata olursa orijinal satırları koru
-                        print(f"URL parse edilemedi, orijinal hali korunuyor: {url_line}")
-                        processed_lines.append(extinf_line)
-                        processed_lines.append(url_line)
-                else:
-                    # Proxy formatında değilse, satırları olduğu gibi ekle
-                    processed_lines.append(extinf_line)
-                    processed_lines.append(url_line)
-        i += 1
-
-    # İşlenmiş içeriği çıktı dosyasına yaz
-    print(f"İşlenmiş M3U dosyası kaydediliyor: {OUTPUT_FILE}")
-    try:
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            f.write("\n".join(processed_lines))
-        print("İşlem başarıyla tamamlandı.")
     except IOError as e:
         print(f"Dosyaya yazılırken hata oluştu: {e}")
 
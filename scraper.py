@@ -2,14 +2,16 @@ import requests
 import json
 import sys
 
+import http_client
+from m3u_delta import write_playlist
+from m3u_lib import M3UEntry
+
 # --- AYARLAR ---
 API_URL = "https://c.appbaqend.com/show_valued"
 OUTPUT_FILE = "playlist.m3u"
 
-# M3U dosyasının başlık formatı
-M3U_HEADER = "#EXTM3U\n"
-# Her bir kanal için M3U formatı
-M3U_TEMPLATE = '#EXTINF:-1 tvg-logo="" group-title="{group}",{name}\n{url}\n'
+# Her bir kanal için #EXTINF formatı
+EXTINF_TEMPLATE = '#EXTINF:-1 tvg-logo="" group-title="{group}",{name}'
 
 def fetch_and_create_playlist():
     """
@@ -23,7 +25,7 @@ def fetch_and_create_playlist():
             'Referer': 'https://yakatv4.live/'
         }
         
-        response = requests.get(API_URL, headers=headers, timeout=20)
+        response = http_client.get(API_URL, headers=headers, timeout=20)
         response.raise_for_status()
         data = response.json()
         
@@ -37,35 +39,36 @@ def fetch_and_create_playlist():
 
         # --- DÜZELTME BURADA ---
         # Dosya yazma işlemi artık her durumda (liste boş olsa bile) çalışacak.
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            f.write(M3U_HEADER)
-            
+        # Önceki listeyle aynıysa dosya yeniden yazılmaz.
+        with write_playlist(OUTPUT_FILE) as writer:
             for event in events:
                 channel_name = event.get('name', 'Bilinmeyen Yayın')
                 stream_url = event.get('url', '')
                 group_name = event.get('category_name', 'Diğer')
 
                 if stream_url:
-                    f.write(M3U_TEMPLATE.format(
-                        group=group_name,
-                        name=channel_name,
-                        url=stream_url
+                    writer.write(M3UEntry(
+                        EXTINF_TEMPLATE.format(group=group_name, name=channel_name),
+                        stream_url
                     ))
                     
-        print(f"'{OUTPUT_FILE}' dosyası başarıyla oluşturuldu/güncellendi.")
+        if writer.has_changes():
+            print(f"'{OUTPUT_FILE}' dosyası başarıyla oluşturuldu/güncellendi. ({writer.summary()})")
+        else:
+            print(f"'{OUTPUT_FILE}' güncel, değişiklik yok.")
 
     except requests.exceptions.RequestException as e:
         print(f"HATA: API'ye bağlanırken bir sorun oluştu: {e}")
         # Hata durumunda da boş bir dosya oluşturarak workflow'un patlamasını engelle
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            f.write(M3U_HEADER)
+        with write_playlist(OUTPUT_FILE):
+            pass
         print("İşleme devam etmek için boş bir playlist.m3u oluşturuldu.")
     
     except Exception as e:
         print(f"HATA: Beklenmedik bir sorun oluştu: {e}")
         # Hata durumunda da boş bir dosya oluştur
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            f.write(M3U_HEADER)
+        with write_playlist(OUTPUT_FILE):
+            pass
         print("İşleme devam etmek için boş bir playlist.m3u oluşturuldu.")
 
 
@@ -1,7 +1,9 @@
 import re
 import certifi
 import os
-import requests
+
+import http_client
+from m3u_compress import publish
 
 # Add the channel logo constant
 CHANNEL_LOGO = "https://github.com/BuddyChewChew/gen-playlist/blob/main/docs/ch.png?raw=true"
@@ -29,10 +31,14 @@ def runServers():
     except Exception as e:
         print(f"Error processing {name}: {str(e)}")    
 
+    # Pre-compressed copy + content hash manifest for GitHub Pages
+    manifest, changed = publish("docs/combined_playlist.m3u")
+    print(f"Published {manifest['file']} (sha256 {manifest['sha256'][:12]}, {'updated' if changed else 'unchanged'})")
+
 def server1(hash, name):
     print("Running Server 1")
     try:
-        res = requests.post(
+        res = http_client.post(
             f"https://adult-tv-channels.click/C1Ep6maUdBIeKDQypo7a/{hash}",
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             timeout=10
@@ -50,7 +56,7 @@ def server2(hash, name):
     print("Running Server 2")
     try:
         url = f"https://fuckflix.click/8RLxsc2AW1q8pvyvjqIQ"
-        res = requests.post(
+        res = http_client.post(
             f"{url}/{hash}", 
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             timeout=10
@@ -0,0 +1,223 @@
+# title_cluster.py
+# Film listelerinde aynı eserin tekrarlarını başlık benzerliğiyle kümeler.
+#
+# Tüm girişleri ikişer ikişer karşılaştırmak O(n²) olurdu. Bunun yerine her
+# başlık Türkçe karakterleri sadeleştirilmiş bir anahtara çevrilir ve anahtarın
+# ilk birkaç karakteri "blok" olarak kullanılır; difflib benzerliği yalnızca
+# aynı bloktaki kümelerle hesaplanır. Bloklar küçük olduğundan toplam maliyet
+# liste boyutuyla yaklaşık doğrusal artar.
+#
+# Aynı adlı farklı eserler (ör. 1976, 2003 ve 2018 yapımı "Çılgın Cuma")
+# tvg-logo dosya adındaki ya da başlıktaki yıl ipucuyla ve tvg-id'deki IMDb
+# numarasıyla ayrılır. Yılı bilinmeyen bir giriş, ancak tek bir aday kümeyle
+# eşleşiyorsa o kümeye katılır.
+#
+# Kullanım:
+#   python title_cluster.py liste.m3u                 # küme istatistikleri
+#   python title_cluster.py liste.m3u -o tekil.m3u    # tekrarları ayıkla
+
+import os
+import re
+import sys
+from difflib import SequenceMatcher
+
+from m3u_lib import M3UReader, M3UWriter
+
+# Exxen.py'deki sanitize_id ile aynı Türkçe karakter eşlemesi (küçük harfe indirgenmiş)
+_TR_FOLD = str.maketrans({
+    "ç": "c", "Ç": "c", "ğ": "g", "Ğ": "g", "ı": "i", "I": "i", "İ": "i",
+    "ö": "o", "Ö": "o", "ş": "s", "Ş": "s", "ü": "u", "Ü": "u",
+})
+
+# Başlıklarda eseri değil kaynağı tanımlayan ekler
+NOISE_WORDS = {"izle", "turkce", "dublaj", "altyazili", "hd", "full", "1080p", "720p"}
+
+_YEAR_RE = re.compile(r"(?<!\d)(19[2-9]\d|20[0-4]\d)(?!\d)")
+# Başlıkta yalnızca parantez içindeki yıl ipucu sayılır; "Wonder Woman 1984"
+# gibi adın parçası olan sayılar anahtarda kalır
+_TITLE_YEAR_RE = re.compile(r"[(\[]\s*(19[2-9]\d|20[0-4]\d)\s*[)\]]")
+_IMDB_RE = re.compile(r"^tt\d+$")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+# "( IMDB: 6.4 | TÜRKÇE DUBLAJ )", "[HD]" gibi etiketler
+_BRACKET_RE = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+
+BLOCK_PREFIX = 5
+THRESHOLD = 0.88
+
+
+def fold_title(title):
+    """Başlığı karşılaştırma anahtarına çevirir: Türkçe sadeleştirme, etiket ve gürültü ayıklama."""
+    text = _BRACKET_RE.sub(" ", (title or "").translate(_TR_FOLD).lower())
+    text = _NON_WORD_RE.sub(" ", text)
+    words = [w for w in text.split() if w not in NOISE_WORDS]
+    return " ".join(words)
+
+
+def year_hint(entry):
+    """
+    Yapım yılı ipucu: önce başlıkta, sonra tvg-logo dosya adında aranır.
+    Logo yolundaki klasörler (ör. "uploads/filmler/2024-08/") yükleme tarihi
+    olduğundan yalnızca dosya adı kullanılır.
+    """
+    m = _TITLE_YEAR_RE.search(entry.title or "")
+    if m:
+        return m.group(1)
+    logo = entry.get_attr("tvg-logo")
+    if logo:
+        m = _YEAR_RE.search(logo.rsplit("/", 1)[-1])
+        if m:
+            return m.group(1)
+    return None
+
+
+def _numbers(key):
+    """Anahtardaki sayılar; devam filmlerini (ör. "John Wick 3" / "4") ayırır."""
+    return tuple(w for w in key.split() if w.isdigit())
+
+
+def imdb_hint(entry):
+    tvg_id = entry.get_attr("tvg-id")
+    return tvg_id if tvg_id and _IMDB_RE.match(tvg_id) else None
+
+
+class Cluster:
+    """Aynı eser olduğu düşünülen girişler; ilk giriş kümenin temsilcisidir."""
+
+    __slots__ = ("key", "numbers", "year", "imdb", "members", "_matcher")
+
+    def __init__(self, key, year, imdb, entry):
+        self.key = key
+        self.numbers = _numbers(key)
+        self.year = year
+        self.imdb = imdb
+        self.members = [entry]
+        self._matcher = None
+
+    @property
+    def first(self):
+        return self.members[0]
+
+    def compatible(self, year, imdb):
+        """Yıl veya IMDb numarası kümeninkiyle çelişmiyorsa True."""
+        if imdb and self.imdb:
+            return imdb == self.imdb
+        return not (year and self.year and year != self.year)
+
+    def similarity(self, key, threshold=THRESHOLD):
+        if self._matcher is None:
+            # Temsilci anahtar seq2 olarak bir kez hazırlanır
+            self._matcher = SequenceMatcher(None, autojunk=False)
+            self._matcher.set_seq2(self.key)
+        m = self._matcher
+        m.set_seq1(key)
+        if m.real_quick_ratio() < threshold or m.quick_ratio() < threshold:
+            return 0.0
+        return m.ratio()
+
+
+class TitleClusterer:
+    """
+    Girişleri geldikleri sırayla kümeler; karar her giriş için anında
+    verildiğinden akan bir birleştirmede (merge_m3u) doğrudan kullanılabilir.
+    """
+
+    def __init__(self, threshold=THRESHOLD, prefix=BLOCK_PREFIX):
+        self.threshold = threshold
+        self.prefix = prefix
+        self.clusters = []
+        self._blocks = {}
+        self._exact = {}
+        self.comparisons = 0
+
+    def _match(self, key, year, imdb):
+        exact = self._exact.get((key, year, imdb))
+        if exact is not None:
+            return exact
+        numbers = _numbers(key)
+        candidates = []
+        for cluster in self._blocks.get(key[:self.prefix], ()):
+            if not cluster.compatible(year, imdb):
+                continue
+            if imdb and cluster.imdb == imdb:
+                return cluster
+            if cluster.numbers != numbers:
+                continue
+            self.comparisons += 1
+            if cluster.key == key or cluster.similarity(key, self.threshold) >= self.threshold:
+                candidates.append(cluster)
+        if year or imdb:
+            return candidates[0] if candidates else None
+        # Yılı bilinmeyen giriş yalnızca tek adayla eşleşirse katılır
+        years = {c.year or c.imdb for c in candidates}
+        return candidates[0] if len(years) == 1 else None
+
+    def add(self, entry):
+        """Girişi kümeye ekler; (küme, yeni_küme_mi) döndürür."""
+        key = fold_title(entry.title) if entry.extinf else ""
+        year = year_hint(entry)
+        imdb = imdb_hint(entry)
+        cluster = self._match(key, year, imdb) if key else None
+        if cluster is not None:
+            cluster.members.append(entry)
+            if cluster.year is None:
+                cluster.year = year
+            if cluster.imdb is None:
+                cluster.imdb = imdb
+            return cluster, False
+
+        cluster = Cluster(key, year, imdb, entry)
+        self.clusters.append(cluster)
+        self._blocks.setdefault(key[:self.prefix], []).append(cluster)
+        self._exact.setdefault((key, year, imdb), cluster)
+        return cluster, True
+
+    def duplicates(self):
+        return sum(len(c.members) - 1 for c in self.clusters)
+
+
+def collapse(entries, **kwargs):
+    """Her kümenin yalnızca ilk girişini (öncelik sırasıyla) üretir."""
+    clusterer = TitleClusterer(**kwargs)
+    for entry in entries:
+        if clusterer.add(entry)[1]:
+            yield entry
+
+
+def cluster_entries(entries, **kwargs):
+    """Tüm girişleri kümeler ve ilk görülme sırasıyla küme listesini döndürür."""
+    clusterer = TitleClusterer(**kwargs)
+    for entry in entries:
+        clusterer.add(entry)
+    return clusterer.clusters
+
+
+def main(argv):
+    if not argv:
+        print("Kullanım: python title_cluster.py liste.m3u [-o cikti.m3u]")
+        return 1
+    path = argv[0]
+    output = argv[argv.index("-o") + 1] if "-o" in argv else None
+
+    with open(path, encoding="utf-8", errors="replace") as f:
+        clusterer = TitleClusterer()
+        for entry in M3UReader(f):
+            clusterer.add(entry)
+
+    total = sum(len(c.members) for c in clusterer.clusters)
+    print(f"{path}: {total} giriş, {len(clusterer.clusters)} küme, "
+          f"{clusterer.duplicates()} tekrar ({clusterer.comparisons} benzerlik karşılaştırması)")
+    biggest = sorted((c for c in clusterer.clusters if len(c.members) > 1),
+                     key=lambda c: len(c.members), reverse=True)[:10]
+    for c in biggest:
+        print(f"  {len(c.members):>3} x {c.first.title} ({c.year or '?'})")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            writer = M3UWriter(f)
+            writer.write_all(c.first for c in clusterer.clusters)
+        print(f"{writer.count} tekil giriş {os.path.basename(output)} dosyasına yazıldı.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
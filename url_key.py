@@ -0,0 +1,107 @@
+# url_key.py
+# Kaynaklar arası tekrar ayıklama için kanonik URL anahtarı.
+#
+# Aynı yayın farklı listelerde farklı biçimlerde görünebilir:
+#   https://3.nejyoner19.workers.dev/?url=https://d3.premiumvideo.click/x/
+#   https://d3.premiumvideo.click/x
+#   HTTPS://D3.PremiumVideo.click/x?b=2&a=1  ~  https://d3.premiumvideo.click/x?a=1&b=2
+# canonical_url() bilinen proxy sarmalayıcılarını url_rules tablosuyla açar;
+# şemayı, host harflerini, varsayılan portu, sorgu sırasını ve sondaki "/"
+# karakterini normalleştirir. KeyIndex bu biçimin 8 baytlık özetini saklar;
+# üyelik testi O(1) ve URL başına bellek sabittir.
+
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+from url_rules import compile_rules
+
+# Asıl adresi "url" sorgu parametresinde taşıyan bilinen proxy sarmalayıcıları.
+# Son kural, listede olmayan sarmalayıcıları da yakalar; ancak yalnızca
+# parametre değeri bir http(s) adresiyse uygulanır.
+PROXY_WRAPPERS = [
+    {"host": "2.nejyoner19.workers.dev", "extract": "url"},
+    {"host": "3.nejyoner19.workers.dev", "extract": "url"},
+    {"host": "zeroipday-zeroipday.hf.space", "path": "/proxy/", "extract": "url"},
+    {"host": "pulutotv-alsancak.hf.space", "path": "/proxy/", "extract": "url"},
+    {"host": "*", "extract": "url", "rewrite": (r"^(https?://.+)$", "{0}")},
+]
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# İç içe sarmalanmış adresler için en fazla açma sayısı
+_MAX_UNWRAP = 4
+
+_unwrap_rules = compile_rules(PROXY_WRAPPERS)
+
+
+def unwrap(url):
+    """Proxy sarmalayıcılarını (iç içe olanlar dahil) açarak asıl adresi döndürür."""
+    for _ in range(_MAX_UNWRAP):
+        inner, _options = _unwrap_rules.apply(url)
+        if inner == url:
+            break
+        url = inner.strip()
+    return url
+
+
+def canonical_url(url):
+    """
+    URL'nin karşılaştırma için kanonik biçimi. Sadece anahtar üretiminde
+    kullanılır; listeye yazılan adres değiştirilmez.
+    """
+    url = unwrap(url.strip())
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port is not None and str(port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+    # http ve https aynı yayını gösterir
+    if scheme == "http":
+        scheme = "https"
+
+    path = parts.path.rstrip("/")
+    query = "&".join(sorted(p for p in parts.query.split("&") if p))
+    # Parça (#...) sunucuya gitmez, anahtara dahil edilmez
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_key(url):
+    """Kanonik URL'nin 8 baytlık özeti."""
+    return hashlib.blake2b(canonical_url(url).encode("utf-8"), digest_size=8).digest()
+
+
+class KeyIndex:
+    """Kanonik URL özetlerinden oluşan küme."""
+
+    __slots__ = ("_keys",)
+
+    def __init__(self, urls=()):
+        self._keys = set()
+        for url in urls:
+            self.add(url)
+
+    def add(self, url):
+        """Adresi ekler; daha önce görülmemişse True döndürür."""
+        return self.add_key(url_key(url))
+
+    def add_key(self, key):
+        """Önceden hesaplanmış url_key özetini ekler (ör. işçi süreçten gelen)."""
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def __contains__(self, url):
+        return url_key(url) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
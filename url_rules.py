@@ -0,0 +1,172 @@
+# url_rules.py
+# Proxy çözme, yol şablonlama ve başlık ekleme işlerini tek bir bildirimsel
+# kural tablosundan yürüten URL yeniden yazma motoru.
+#
+# Kural tablosu sözlüklerden oluşur. Desteklenen anahtarlar:
+#   host      : tam host eşleşmesi ("*" her URL'ye uyar, son çare kuralı)
+#   match     : host yerine URL ön eki ile eşleşme ("https://a.b/proxy/")
+#   path      : host ile birlikte aranacak yol ön eki ("/proxy/m3u")
+#   contains  : URL'nin herhangi bir yerinde geçmesi gereken metin (büyük/küçük
+#               harf duyarlı; ör. başka bir sitenin yolu içine gömülü proxy)
+#   extract   : asıl URL'nin alınacağı sorgu parametresi ("url")
+#   unquote   : çıkarılan değere bir kez daha unquote uygula
+#   rewrite   : (regex, şablon) - eşleşmezse kural uygulanmaz
+#   prefix    : sonuç URL'nin başına eklenecek metin
+#   headers   : #EXTVLCOPT olarak eklenecek {"http-referrer": ...} başlıkları
+#
+# Derleme sonrası her URL için host bir kez çıkarılır ve sözlükten O(1) ile
+# aday kurallar bulunur; host'a bağlı olmayan ön ek kuralları tek bir
+# birleşik regex ile denenir, "contains" kuralları basit alt dize aramasıdır.
+# urlparse/parse_qs satır başına çalışmaz.
+
+import re
+from urllib.parse import unquote, unquote_plus
+
+VLC_OPT = "#EXTVLCOPT:"
+
+
+def _split_url(url):
+    """URL'yi (host, yol+sorgu başlangıcı indeksi) olarak hızlıca ayırır."""
+    scheme_end = url.find("://")
+    if scheme_end < 0:
+        return "", len(url)
+    host_start = scheme_end + 3
+    end = len(url)
+    for sep in "/?#":
+        i = url.find(sep, host_start)
+        if 0 <= i < end:
+            end = i
+    return url[host_start:end].lower(), end
+
+
+def _query_param(url, name):
+    """
+    Sorgu dizesinden tek bir parametreyi parse_qs ile aynı kurallarla
+    (& ile biter, + boşluk olur, %xx çözülür) çıkarır.
+    """
+    q = url.find("?")
+    if q < 0:
+        return None
+    key = name + "="
+    pos = q + 1
+    while pos <= len(url):
+        amp = url.find("&", pos)
+        if amp < 0:
+            amp = len(url)
+        if url.startswith(key, pos):
+            value = url[pos + len(key):amp]
+            hash_pos = value.find("#")
+            if hash_pos >= 0:
+                value = value[:hash_pos]
+            return unquote_plus(value) or None
+        pos = amp + 1
+    return None
+
+
+class Rule:
+    """Derlenmiş tek bir yeniden yazma kuralı."""
+
+    __slots__ = ("host", "match", "contains", "path", "extract", "unquote", "rewrite",
+                 "template", "prefix", "options")
+
+    def __init__(self, host=None, match=None, contains=None, path="", extract=None, unquote=False,
+                 rewrite=None, prefix="", headers=None):
+        if not host and not match and not contains:
+            raise ValueError("Kuralda 'host', 'match' veya 'contains' belirtilmeli.")
+        self.host = host.lower() if host else None
+        self.match = match
+        self.contains = contains
+        self.path = path
+        self.extract = extract
+        self.unquote = unquote
+        self.rewrite = re.compile(rewrite[0]) if rewrite else None
+        self.template = rewrite[1] if rewrite else None
+        self.prefix = prefix
+        self.options = [f"{VLC_OPT}{k}={v}" for k, v in (headers or {}).items()]
+
+    def apply(self, url):
+        """Kuralı uygular; uygulanamıyorsa None döndürür."""
+        if self.extract:
+            url = _query_param(url, self.extract)
+            if not url:
+                return None
+            if self.unquote:
+                url = unquote(url)
+        if self.rewrite is not None:
+            m = self.rewrite.search(url)
+            if not m:
+                return None
+            url = self.template.format(*m.groups(), **m.groupdict())
+        return self.prefix + url
+
+
+class RuleSet:
+    """Kural tablosunu host anahtarlı tek bir dağıtıcıya derler."""
+
+    def __init__(self, rules):
+        self._by_host = {}
+        self._prefix_rules = []
+        self._contains_rules = []
+        self._fallback = []
+        for spec in rules:
+            rule = spec if isinstance(spec, Rule) else Rule(**spec)
+            if rule.host == "*":
+                self._fallback.append(rule)
+            elif rule.host:
+                self._by_host.setdefault(rule.host, []).append(rule)
+            elif rule.match:
+                self._prefix_rules.append(rule)
+            else:
+                self._contains_rules.append(rule)
+        # Aynı host içinde en uzun yol ön eki önce denenir
+        for host_rules in self._by_host.values():
+            host_rules.sort(key=lambda r: len(r.path), reverse=True)
+        self._prefix_re = None
+        if self._prefix_rules:
+            self._prefix_re = re.compile("|".join(
+                f"(?P<r{i}>{re.escape(r.match)})" for i, r in enumerate(self._prefix_rules)
+            ))
+
+    def _candidates(self, url):
+        host, path_start = _split_url(url)
+        for rule in self._by_host.get(host, ()):
+            if url.startswith(rule.path, path_start):
+                yield rule
+        if self._prefix_re is not None:
+            m = self._prefix_re.match(url)
+            if m:
+                yield self._prefix_rules[int(m.lastgroup[1:])]
+        for rule in self._contains_rules:
+            if rule.contains in url:
+                yield rule
+        yield from self._fallback
+
+    def apply(self, url):
+        """
+        İlk uygulanabilen kuralı çalıştırır ve (yeni url, #EXTVLCOPT satırları)
+        döndürür. Hiçbir kural uymazsa (url, []) döner.
+        """
+        for rule in self._candidates(url):
+            new_url = rule.apply(url)
+            if new_url is not None:
+                return new_url, rule.options
+        return url, []
+
+    def apply_entry(self, entry):
+        """
+        Kuralı bir M3UEntry üzerinde uygular. Eklenen başlıklar aynı anahtarlı
+        eski #EXTVLCOPT satırlarının yerini alır. Değişiklik olduysa True döner.
+        """
+        new_url, options = self.apply(entry.url)
+        if new_url == entry.url and not options:
+            return False
+        entry.url = new_url
+        if options:
+            keys = {opt.split("=", 1)[0] for opt in options}
+            entry.options = [o for o in entry.options if o.split("=", 1)[0] not in keys] + options
+        return True
+
+
+def compile_rules(rules):
+    """Bildirimsel kural tablosunu RuleSet'e derler."""
+    return RuleSet(rules)